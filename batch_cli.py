@@ -0,0 +1,8 @@
+"""Headless entry point next to the Streamlit app; see mixdesign.cli."""
+
+import sys
+
+from mixdesign.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
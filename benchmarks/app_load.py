@@ -0,0 +1,219 @@
+"""Headless multi-session load harness for the Streamlit app.
+
+Opens many AppTest sessions of app.py in one process and drives them
+round-robin through a fixed cycle of interactions: slump slider, grade,
+admixture toggle, Calculate, history filter. It reports reruns/sec, CPU
+time per rerun (all threads, so it includes the script thread), mean
+wall time per interaction and traced memory retained per session. Wall
+time includes AppTest's polling of the script thread; CPU time is the
+closer measure of server load.
+With --ref the same load is run against app.py from an earlier commit,
+for a before/after comparison.
+
+AppTest replays every interaction as a full script run, including those
+inside st.fragment panels, so these figures are full-rerun costs. A
+browser session reruns only the fragment for Calculate and history
+interactions; the fragment figures time those interactions through a
+harness script that, after one full run, runs only the panel's fragment
+function, which is the script work of a fragment rerun.
+
+    python benchmarks/app_load.py --sessions 20 --steps 20 --ref HEAD~1
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from streamlit.testing.v1 import AppTest
+
+GRADE_CYCLE = ('M20', 'M25', 'M30', 'M40')
+SLUMP_CYCLE = (50, 75, 100, 125)
+
+# Enough stack to see whether an allocation came from Streamlit's script cache
+SCRIPT_CACHE_FRAMES = 8
+
+def _widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+def interact(at, step):
+    """Apply the ``step``-th interaction of the cycle and rerun; returns its name."""
+    kind = ('slump', 'grade', 'calculate', 'admixture', 'history')[step % 5]
+    turn = step // 5
+    if kind == 'slump':
+        _widget(at.slider, '**Slump (mm)**').set_value(SLUMP_CYCLE[turn % len(SLUMP_CYCLE)])
+    elif kind == 'grade':
+        _widget(at.selectbox, '**Concrete Grade**').set_value(GRADE_CYCLE[turn % len(GRADE_CYCLE)])
+    elif kind == 'calculate':
+        next(button for button in at.button if 'Calculate' in button.label).click()
+    elif kind == 'admixture':
+        _widget(at.checkbox, 'Use Chemical Admixture').set_value(turn % 2 == 1)
+    else:
+        _widget(at.selectbox, 'Grade').set_value(GRADE_CYCLE[turn % len(GRADE_CYCLE)])
+    at.run()
+    if at.exception:
+        raise RuntimeError(f'{kind}: {at.exception[0].value}')
+    return kind
+
+# After one full run of the app, runs only the fragment of the interaction
+# being measured, with the arguments main() passed it
+FRAGMENT_HARNESS = '''
+import sys
+sys.path.insert(0, {root!r})
+import streamlit as st
+import app
+
+args = st.session_state.get('bench_args')
+if args is None:
+    panel = app.design_panel
+    def record(input_params, project):
+        st.session_state['bench_args'] = (input_params, project)
+        panel(input_params, project)
+    app.design_panel = record
+    try:
+        app.main()
+    finally:
+        app.design_panel = panel
+elif st.session_state['bench_panel'] == 'calculate':
+    input_params, project = args
+    app.design_panel({{**input_params, 'workability_slump': st.session_state['bench_slump']}}, project)
+else:
+    app.history_panel()
+'''
+
+def fragment_interact(at, kind, turn):
+    at.session_state['bench_panel'] = kind
+    if kind == 'calculate':
+        at.session_state['bench_slump'] = SLUMP_CYCLE[turn % len(SLUMP_CYCLE)]
+        next(button for button in at.button if 'Calculate' in button.label).click()
+    else:
+        _widget(at.selectbox, 'Grade').set_value(GRADE_CYCLE[turn % len(GRADE_CYCLE)])
+    at.run()
+    if at.exception:
+        raise RuntimeError(f'{kind} fragment: {at.exception[0].value}')
+
+def run_fragments(sessions, steps, timeout):
+    """Mean wall and CPU time of Calculate and history fragment reruns."""
+    harness = FRAGMENT_HARNESS.format(root=ROOT)
+    stats = {}
+    for kind in ('calculate', 'history'):
+        apps = [AppTest.from_string(harness, default_timeout=timeout).run() for _ in range(sessions)]
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        for turn in range(steps):
+            for at in apps:
+                fragment_interact(at, kind, turn)
+        runs = sessions * steps
+        stats[kind] = {
+            'ms': (time.perf_counter() - started) / runs * 1000,
+            'cpu_ms': (time.process_time() - cpu_started) / runs * 1000
+        }
+    return stats
+
+def run_load(app_path, sessions, steps, timeout):
+    started = time.perf_counter()
+    apps = [AppTest.from_file(app_path, default_timeout=timeout).run() for _ in range(sessions)]
+    first_run = (time.perf_counter() - started) / sessions
+
+    timings = {}
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for step in range(steps):
+        for at in apps:
+            start = time.perf_counter()
+            kind = interact(at, step)
+            timings.setdefault(kind, []).append(time.perf_counter() - start)
+    seconds = time.perf_counter() - started
+    cpu_seconds = time.process_time() - cpu_started
+    reruns = sessions * steps
+    return {
+        'sessions': sessions,
+        'steps': steps,
+        'reruns': reruns,
+        'seconds': seconds,
+        'reruns_per_sec': reruns / seconds,
+        'cpu_ms_per_rerun': cpu_seconds / reruns * 1000,
+        'first_run_ms': first_run * 1000,
+        'rerun_ms': {kind: sum(values) / len(values) * 1000 for kind, values in timings.items()}
+    }
+
+def memory_per_session(app_path, sessions, steps, timeout):
+    """Traced memory retained per live session after the interaction cycle."""
+    # One warm-up session so shared caches and imports are not counted
+    interact(AppTest.from_file(app_path, default_timeout=timeout).run(), 0)
+    tracemalloc.start(SCRIPT_CACHE_FRAMES)
+    baseline = tracemalloc.take_snapshot()
+    apps = [AppTest.from_file(app_path, default_timeout=timeout).run() for _ in range(sessions)]
+    for step in range(steps):
+        for at in apps:
+            interact(at, step)
+    # Each AppTest compiles its own copy of the script; a server compiles
+    # it once for all sessions, so that is not counted
+    shared = [tracemalloc.Filter(False, '*/script_cache.py', all_frames=True)]
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().filter_traces(shared)
+                   .compare_to(baseline.filter_traces(shared), 'filename'))
+    tracemalloc.stop()
+    return retained / sessions / 2**20
+
+def app_at_ref(ref, directory):
+    source = subprocess.run(['git', 'show', f'{ref}:app.py'], cwd=ROOT, capture_output=True,
+                            text=True, check=True).stdout
+    path = os.path.join(directory, 'app_before.py')
+    with open(path, 'w') as handle:
+        handle.write(source)
+    return path
+
+def measure(label, app_path, args, store, fragments=False):
+    # Each app starts from an empty design history
+    os.environ['MIX_DESIGN_STORE'] = store
+    stats = run_load(app_path, args.sessions, args.steps, args.timeout)
+    if not args.no_memory:
+        stats['memory_per_session_mb'] = memory_per_session(
+            app_path, min(args.sessions, 10), min(args.steps, 10), args.timeout)
+    per_kind = ', '.join(f'{kind} {ms:.0f} ms' for kind, ms in stats['rerun_ms'].items())
+    memory = stats.get('memory_per_session_mb')
+    print(f"{label}: {stats['reruns_per_sec']:.1f} reruns/s, "
+          f"{stats['cpu_ms_per_rerun']:.1f} ms CPU per rerun ({per_kind})"
+          + ('' if memory is None else f', {memory:.2f} MB per session'))
+    if fragments:
+        stats['fragment'] = run_fragments(args.sessions, max(args.steps // 5, 1), args.timeout)
+        print(f"{label} fragment reruns: " + ', '.join(
+            f"{kind} {values['ms']:.0f} ms ({values['cpu_ms']:.1f} ms CPU, "
+            f"full rerun {stats['rerun_ms'][kind]:.0f} ms)"
+            for kind, values in stats['fragment'].items()))
+    return stats
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sessions', type=int, default=20)
+    parser.add_argument('--steps', type=int, default=20, help='interactions per session')
+    parser.add_argument('--ref', help='also measure app.py at this git ref')
+    parser.add_argument('--timeout', type=float, default=60)
+    parser.add_argument('--no-memory', action='store_true')
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Keep the load's design history out of the working tree
+        report = {}
+        if args.ref:
+            report['before'] = measure(f'app.py at {args.ref}', app_at_ref(args.ref, directory), args,
+                                       os.path.join(directory, 'before.sqlite'))
+        report['after'] = measure('app.py', os.path.join(ROOT, 'app.py'), args,
+                                  os.path.join(directory, 'after.sqlite'), fragments=True)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(report, handle, indent=2)
+            handle.write('\n')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
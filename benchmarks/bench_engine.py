@@ -0,0 +1,294 @@
+"""Benchmarks and golden-output check for the design engine.
+
+Builds a reproducible corpus of mix requests from the app's input domains
+and measures scalar perform_full_design() latency, design_batch()
+throughput, DesignCache hit-path latency and peak traced memory. The same
+corpus is the golden check: every batch row must equal the scalar
+ConcreteMixDesign result exactly, and the scalar results must match the
+digest recorded in golden.json. That digest comes from the original
+ConcreteMixDesign (app.py of the repository's first commit), so it covers
+the outputs that engine had. Results are written as JSON so runs on
+different commits can be compared.
+
+    python benchmarks/bench_engine.py                  # 1k and 100k rows
+    python benchmarks/bench_engine.py --full           # also 10M rows, chunked
+    python benchmarks/bench_engine.py --compare benchmarks/results/bench-abc1234.json
+    python benchmarks/bench_engine.py --update-golden  # rerun the original engine
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mixdesign import (
+    ADMIXTURE_TYPES, AGGREGATE_SIZES, CEMENT_TYPES, EXPOSURE_OPTIONS, FINE_AGG_ZONES,
+    GRADES, SITE_CONTROLS, SLUMP_RANGE, ConcreteMixDesign, DesignCache
+)
+from mixdesign.batch import design_batch
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden.json')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+# Scalar outputs compared with the batch engine
+GOLDEN_KEYS = (
+    'target_strength', 'wc_ratio', 'water_content', 'cement_content',
+    'vol_coarse', 'vol_fine', 'air_content', 'admixture_mass', 'vol_all_aggregate',
+    'fine_agg_mass', 'coarse_agg_mass'
+)
+
+# Outputs of the original engine, covered by the golden digest
+BASELINE_KEYS = GOLDEN_KEYS[:7]
+
+BATCH_SIZES = (1_000, 100_000)
+FULL_BATCH_SIZE = 10_000_000
+
+def corpus(rows, seed=0):
+    """``rows`` mix requests drawn uniformly from the app's input domains."""
+    rng = np.random.default_rng(seed)
+    exposures = list(EXPOSURE_OPTIONS)
+    admixtures = ['None'] + ADMIXTURE_TYPES
+    exposure_code = rng.integers(len(exposures), size=rows)
+    admix_code = rng.integers(len(admixtures), size=rows)
+    max_wc = np.array([EXPOSURE_OPTIONS[e]['max_wc'] for e in exposures])
+    min_cement = np.array([EXPOSURE_OPTIONS[e]['min_cement'] for e in exposures], dtype=float)
+    return pd.DataFrame({
+        'grade': np.array(GRADES, dtype=object)[rng.integers(len(GRADES), size=rows)],
+        'exposure': np.array(exposures, dtype=object)[exposure_code],
+        'cement_type': np.array(CEMENT_TYPES, dtype=object)[rng.integers(len(CEMENT_TYPES), size=rows)],
+        'max_aggregate_size': np.array(AGGREGATE_SIZES)[rng.integers(len(AGGREGATE_SIZES), size=rows)],
+        'fine_agg_zone': np.array(FINE_AGG_ZONES, dtype=object)[rng.integers(len(FINE_AGG_ZONES), size=rows)],
+        'workability_slump': rng.integers(SLUMP_RANGE[0], SLUMP_RANGE[1] + 1, size=rows),
+        'use_admixture': admix_code > 0,
+        'admixture_type': np.array(admixtures, dtype=object)[admix_code],
+        'site_control': np.array(SITE_CONTROLS, dtype=object)[rng.integers(len(SITE_CONTROLS), size=rows)],
+        'max_wc_ratio': max_wc[exposure_code],
+        'min_cement_content': min_cement[exposure_code]
+    })
+
+def scalar_design(params, designer_class=ConcreteMixDesign):
+    designer = designer_class()
+    designer.set_input_parameters(params)
+    return designer.perform_full_design()
+
+def baseline_designer_class():
+    """ConcreteMixDesign as first committed, from app.py of the root commit."""
+    root = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout.split()[0]
+    source = subprocess.run(['git', 'show', f'{root}:app.py'], cwd=ROOT,
+                            capture_output=True, text=True, check=True).stdout
+    # Only the class is run; the rest of that app.py is the Streamlit UI
+    node = next(node for node in ast.parse(source).body
+                if isinstance(node, ast.ClassDef) and node.name == 'ConcreteMixDesign')
+    namespace = {'math': math}
+    exec(compile(ast.Module([node], type_ignores=[]), f'{root[:7]}:app.py', 'exec'), namespace)
+    return namespace['ConcreteMixDesign']
+
+def scalar_digest(records, designer_class=ConcreteMixDesign):
+    """Digest of the BASELINE_KEYS outputs (or error) of every record."""
+    digest = hashlib.sha256()
+    for params in records:
+        results = scalar_design(params, designer_class)
+        if results['success']:
+            expected = tuple(results[key] for key in BASELINE_KEYS)
+        else:
+            expected = (results['error'],)
+        digest.update(repr(expected).encode())
+    return digest.hexdigest()
+
+def golden_check(rows, seed):
+    """Compare design_batch() with the scalar path row by row; returns the
+    mismatch count and the scalar digest."""
+    frame = corpus(rows, seed)
+    records = frame.to_dict('records')
+    batch = design_batch(frame)
+    mismatches = []
+    for index, params in enumerate(records):
+        results = scalar_design(params)
+        row = batch.iloc[index]
+        if results['success']:
+            expected = tuple(results[key] for key in GOLDEN_KEYS)
+            actual = tuple(row[key] for key in GOLDEN_KEYS)
+        else:
+            expected, actual = (results['error'],), (row['error'],)
+        if bool(row['success']) != results['success'] or actual != expected:
+            mismatches.append(index)
+    return {
+        'rows': rows,
+        'seed': seed,
+        'mismatches': len(mismatches),
+        'first_mismatches': mismatches[:10],
+        'digest': scalar_digest(records)
+    }
+
+def percentiles(samples):
+    samples = np.asarray(samples) * 1e6
+    return {
+        'mean_us': float(samples.mean()),
+        'p50_us': float(np.percentile(samples, 50)),
+        'p99_us': float(np.percentile(samples, 99))
+    }
+
+def bench_scalar(records, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        for params in records:
+            start = time.perf_counter()
+            scalar_design(params)
+            timings.append(time.perf_counter() - start)
+    return {'designs': len(timings), **percentiles(timings)}
+
+def bench_cache_hits(records, repeat=3):
+    cache = DesignCache(maxsize=len(records))
+    for params in records:
+        cache.design(params)
+    timings = []
+    for _ in range(repeat):
+        for params in records:
+            start = time.perf_counter()
+            cache.design(params)
+            timings.append(time.perf_counter() - start)
+    info = cache.info()
+    return {'lookups': len(timings), 'hits': info['hits'], **percentiles(timings)}
+
+def bench_batch(rows, seed, chunk_size, trace_memory):
+    """Rows/sec of design_batch(); larger sizes are run in chunks."""
+    seconds = 0.0
+    peak = 0
+    done = 0
+    chunk_index = 0
+    while done < rows:
+        frame = corpus(min(chunk_size, rows - done), seed + chunk_index)
+        start = time.perf_counter()
+        design_batch(frame)
+        seconds += time.perf_counter() - start
+        if trace_memory:
+            # Separate traced run, since tracing slows allocation
+            tracemalloc.start()
+            design_batch(frame)
+            peak = max(peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        done += len(frame)
+        chunk_index += 1
+    return {
+        'rows': rows,
+        'chunk_size': min(chunk_size, rows),
+        'seconds': seconds,
+        'rows_per_sec': rows / seconds,
+        'peak_memory_mb': peak / 2**20 if trace_memory else None
+    }
+
+def git_commit():
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current, previous):
+    """Print the change of each headline figure against an earlier run."""
+    figures = [('scalar p50 (us)', ('scalar', 'p50_us')),
+               ('cache hit p50 (us)', ('cache_hit', 'p50_us'))]
+    for rows in current['batch']:
+        figures.append((f'batch {rows} rows/sec', ('batch', rows, 'rows_per_sec')))
+    for label, path in figures:
+        old, new = previous, current
+        try:
+            for key in path:
+                old, new = old[key], new[key]
+        except KeyError:
+            continue
+        print(f'{label:>28}: {old:14.1f} -> {new:14.1f} ({(new / old - 1) * 100:+.1f}%)')
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--golden-rows', type=int, default=10_000)
+    parser.add_argument('--scalar-rows', type=int, default=2_000)
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(BATCH_SIZES))
+    parser.add_argument('--full', action='store_true', help=f'also run {FULL_BATCH_SIZE:,} rows')
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced memory runs')
+    parser.add_argument('--output', help='results file (default benchmarks/results/bench-<commit>.json)')
+    parser.add_argument('--compare', metavar='PATH', help='earlier results file to compare with')
+    parser.add_argument('--update-golden', action='store_true',
+                        help="record the original engine's outputs as the golden digest")
+    args = parser.parse_args(argv)
+
+    golden = golden_check(args.golden_rows, args.seed)
+    print(f"golden: {golden['rows']} rows, {golden['mismatches']} batch/scalar mismatches")
+    expected = None
+    if args.update_golden:
+        expected = scalar_digest(corpus(args.golden_rows, args.seed).to_dict('records'),
+                                 baseline_designer_class())
+        with open(GOLDEN_PATH, 'w') as handle:
+            json.dump({'rows': golden['rows'], 'seed': golden['seed'], 'digest': expected},
+                      handle, indent=2)
+            handle.write('\n')
+        print(f'golden: wrote {GOLDEN_PATH}')
+    elif os.path.exists(GOLDEN_PATH):
+        with open(GOLDEN_PATH) as handle:
+            recorded = json.load(handle)
+        if (recorded['rows'], recorded['seed']) == (golden['rows'], golden['seed']):
+            expected = recorded['digest']
+    golden['digest_matches'] = None if expected is None else golden['digest'] == expected
+    if golden['digest_matches'] is False:
+        print('golden: scalar outputs differ from golden.json')
+
+    records = corpus(args.scalar_rows, args.seed).to_dict('records')
+    scalar = bench_scalar(records)
+    print(f"scalar: p50 {scalar['p50_us']:.1f} us, p99 {scalar['p99_us']:.1f} us")
+    cache_hit = bench_cache_hits(records)
+    print(f"cache hit: p50 {cache_hit['p50_us']:.2f} us, p99 {cache_hit['p99_us']:.2f} us")
+
+    sizes = args.sizes + ([FULL_BATCH_SIZE] if args.full else [])
+    batch = {}
+    for rows in sizes:
+        stats = bench_batch(rows, args.seed, args.chunk_size, not args.no_memory)
+        batch[rows] = stats
+        memory = '' if stats['peak_memory_mb'] is None else f", peak {stats['peak_memory_mb']:.1f} MB"
+        print(f"batch {rows}: {stats['rows_per_sec']:,.0f} rows/sec{memory}")
+
+    commit = git_commit()
+    report = {
+        'commit': commit,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'golden': golden,
+        'scalar': scalar,
+        'cache_hit': cache_hit,
+        # JSON object keys are strings; keep them so --compare can match
+        'batch': {str(rows): stats for rows, stats in batch.items()}
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as handle:
+        json.dump(report, handle, indent=2)
+        handle.write('\n')
+    print(f'wrote {output}')
+
+    if args.compare:
+        with open(args.compare) as handle:
+            compare(report, json.load(handle))
+
+    return 1 if golden['mismatches'] or golden['digest_matches'] is False else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
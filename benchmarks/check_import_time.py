@@ -0,0 +1,57 @@
+"""Import-time regression check for the calculation core.
+
+Imports ``mixdesign`` in fresh interpreters and fails if the cold import
+exceeds the budget or pulls in the UI / dataframe stack.
+
+    python benchmarks/check_import_time.py --budget-ms 50
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORBIDDEN_MODULES = ('streamlit', 'pandas', 'pyarrow', 'tornado')
+
+def cold_import_ms(module):
+    # -X importtime reports cumulative microseconds per imported module
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    for line in result.stderr.splitlines():
+        parts = line.split('|')
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    raise RuntimeError(f'{module} not found in -X importtime output')
+
+def loaded_modules(module):
+    code = f'import sys, {module}; print("\\n".join(sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default='mixdesign')
+    parser.add_argument('--budget-ms', type=float, default=50.0)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    best = min(cold_import_ms(args.module) for _ in range(args.runs))
+    heavy = sorted({m.split('.')[0] for m in loaded_modules(args.module)} & set(FORBIDDEN_MODULES))
+
+    print(f'import {args.module}: {best:.1f} ms (budget {args.budget_ms:.1f} ms)')
+    failed = False
+    if best > args.budget_ms:
+        print('FAIL: cold import exceeds budget')
+        failed = True
+    if heavy:
+        print(f"FAIL: imports heavy modules: {', '.join(heavy)}")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""Load test for the design service.
+
+Opens persistent connections to ``mixdesign.service`` (started here on a
+free port unless --url is given), sends POST /design requests drawn from
+the benchmark corpus and reports p50/p99 latency and throughput, plus the
+service's coalescing and batching counters. A small --unique pool makes
+concurrent requests repeat, which exercises coalescing.
+
+    python benchmarks/load_test.py --requests 50000 --concurrency 64 --unique 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from bench_engine import ROOT, corpus
+
+SERVICE_COUNTERS = (
+    'service_designs', 'service_coalesced', 'service_batches', 'service_vector_rows',
+    'service_scalar_rows'
+)
+
+async def _request(reader, writer, host, method, path, body=b''):
+    writer.write(
+        f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n'
+        f'Content-Length: {len(body)}\r\n\r\n'.encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def _client(host, port, bodies, order, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for index in order:
+            start = time.perf_counter()
+            status, payload = await _request(reader, writer, host, 'POST', '/design', bodies[index])
+            latencies.append(time.perf_counter() - start)
+            if status != 200 or not json.loads(payload)['success']:
+                errors.append(index)
+    finally:
+        writer.close()
+
+async def _service_counters(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        _, payload = await _request(reader, writer, host, 'GET', '/metrics')
+    finally:
+        writer.close()
+    counters = {}
+    for line in payload.decode().splitlines():
+        for name in SERVICE_COUNTERS:
+            if line.startswith(f'mixdesign_events_total{{name="{name}"}}'):
+                counters[name] = float(line.split()[-1])
+    return counters
+
+async def load_test(host, port, requests, concurrency, unique, seed):
+    bodies = [json.dumps(params).encode() for params in corpus(unique, seed).to_dict('records')]
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(unique, size=requests)
+    latencies = []
+    errors = []
+    before = await _service_counters(host, port)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, bodies, picks[worker::concurrency].tolist(), latencies, errors)
+        for worker in range(concurrency)
+    ))
+    seconds = time.perf_counter() - start
+    after = await _service_counters(host, port)
+
+    latencies = np.array(latencies) * 1000
+    return {
+        'requests': requests,
+        'concurrency': concurrency,
+        'unique': unique,
+        'seconds': seconds,
+        'requests_per_sec': requests / seconds,
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+        'max_ms': float(latencies.max()),
+        'errors': len(errors),
+        'service': {name: after.get(name, 0) - before.get(name, 0) for name in SERVICE_COUNTERS}
+    }
+
+def start_service():
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'mixdesign.service', '--port', '0'],
+        cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line.startswith('Serving on '):
+        process.kill()
+        raise RuntimeError('Service did not start')
+    return process, line.split()[-1]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='running service (default: start one on a free port)')
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--unique', type=int, default=1_000, help='distinct designs requested')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args(argv)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_service()
+    try:
+        parts = urlsplit(url)
+        stats = asyncio.run(load_test(parts.hostname, parts.port, args.requests,
+                                      args.concurrency, args.unique, args.seed))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    service = stats['service']
+    print(f"{stats['requests']} requests over {stats['concurrency']} connections in "
+          f"{stats['seconds']:.2f} s: {stats['requests_per_sec']:,.0f} req/s, "
+          f"p50 {stats['p50_ms']:.2f} ms, p99 {stats['p99_ms']:.2f} ms, {stats['errors']} errors")
+    print(f"service: {service['service_coalesced']:.0f} coalesced, "
+          f"{service['service_batches']:.0f} batches, {service['service_vector_rows']:.0f} vectorized "
+          f"and {service['service_scalar_rows']:.0f} scalar designs")
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w') as handle:
+            json.dump(stats, handle, indent=2)
+            handle.write('\n')
+    return 1 if stats['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,19 @@
+"""Concrete mix design as per IS 10262:2019.
+
+The package root only imports the standard-library engine. The NumPy and
+pandas paths live in submodules that are imported on demand:
+``mixdesign.batch`` (design_batch) and ``mixdesign.space`` (DesignSpace).
+"""
+
+from .cache import DesignCache
+from .core import (
+    ADMIXTURE_TYPES, AGGREGATE_SIZES, CEMENT_TYPES, EXPOSURE_OPTIONS, FINE_AGG_ZONES,
+    GRADES, SITE_CONTROLS, SLUMP_RANGE, ConcreteMixDesign, MixInput, design_key
+)
+from .incremental import IncrementalDesign
+
+__all__ = [
+    'ADMIXTURE_TYPES', 'AGGREGATE_SIZES', 'CEMENT_TYPES', 'EXPOSURE_OPTIONS',
+    'FINE_AGG_ZONES', 'GRADES', 'SITE_CONTROLS', 'SLUMP_RANGE',
+    'ConcreteMixDesign', 'DesignCache', 'IncrementalDesign', 'MixInput', 'design_key'
+]
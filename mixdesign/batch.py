@@ -0,0 +1,204 @@
+"""Vectorized design of many mixes per call over pandas frames."""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from .core import (
+    ADMIX_NONE, ADMIXTURE_PERCENTAGE, ESTIMATED_STD_DEV_MARGIN, GRADE_PROPERTIES, SIZE_CODES,
+    SPECIFIC_GRAVITY_ADMIXTURE, SPECIFIC_GRAVITY_CEMENT, SPECIFIC_GRAVITY_COARSE_AGG,
+    SPECIFIC_GRAVITY_FINE_AGG, ZONE_CODES, admixture_class,
+    aggregate_class, cement_class, is_pumped
+)
+from .metrics import METRICS
+from .vectorized import design_arrays, grade_arrays
+
+BATCH_DEFAULTS = {
+    'site_control': 'Good',
+    'aggregate_type': 'Crushed angular aggregate',
+    'placing_method': 'Chute (Non pumpable)',
+    'use_admixture': False,
+    'admixture_type': 'Superplasticizer - normal',
+    'specific_gravity_cement': SPECIFIC_GRAVITY_CEMENT,
+    'specific_gravity_coarse_agg': SPECIFIC_GRAVITY_COARSE_AGG,
+    'specific_gravity_fine_agg': SPECIFIC_GRAVITY_FINE_AGG,
+    'admixture_percentage': ADMIXTURE_PERCENTAGE,
+    'specific_gravity_admixture': SPECIFIC_GRAVITY_ADMIXTURE
+}
+
+def _batch_column(frame, name):
+    if name in frame.columns:
+        column = frame[name]
+        if name in BATCH_DEFAULTS:
+            column = column.fillna(BATCH_DEFAULTS[name])
+        return column
+    if name in BATCH_DEFAULTS:
+        return pd.Series(BATCH_DEFAULTS[name], index=frame.index)
+    raise KeyError(name)
+
+def _output_column(frame, name):
+    # Echoed inputs; a missing column has already failed its rows
+    return frame[name].to_numpy() if name in frame.columns else np.full(len(frame), None, dtype=object)
+
+def _map_unique(column, func, fallback=0):
+    """func() of every row, called once per distinct value.
+
+    Blank rows and values func() rejects get ``fallback``. Returns the
+    values and, per row, the message func() raised (None elsewhere).
+    """
+    codes, uniques = pd.factorize(column)
+    values = []
+    messages = []
+    for value in uniques:
+        try:
+            values.append(func(value))
+            messages.append(None)
+        except Exception as e:
+            values.append(fallback)
+            messages.append(str(e))
+    # Code -1 (blank) picks the trailing fallback
+    values = np.array(values + [fallback])
+    messages = np.array(messages + [None], dtype=object)
+    return values[codes], messages[codes]
+
+def parse_frame(frame, grade_properties):
+    """Table codes for every row of ``frame``, like MixInput per row.
+
+    Returns a dict of arrays keyed like the design_arrays() arguments, plus
+    ``success`` and ``error`` arrays for rows the scalar path would reject:
+    blank required inputs, categories the classifiers cannot read and
+    unknown grades, aggregate sizes and zones, with the scalar error message.
+    """
+    grades = list(grade_properties)
+    grade_index = {grade: code for code, grade in enumerate(grades)}
+    n = len(frame)
+    error = np.full(n, None, dtype=object)
+    failed = np.zeros(n, dtype=bool)
+
+    def reject(bad, message):
+        # Only a row's first error is kept, as the scalar path raises it
+        rows = bad & ~failed
+        if rows.any():
+            error[rows] = message if isinstance(message, str) else message[rows]
+            failed[rows] = True
+
+    def required(name):
+        if name not in frame.columns:
+            # A missing column fails every row, as the missing key does per row
+            reject(np.ones(n, dtype=bool), str(KeyError(name)))
+            return pd.Series(np.nan, index=frame.index)
+        column = frame[name]
+        reject(column.isna().to_numpy(), str(KeyError(name)))
+        return column
+
+    def classify(column, func, applies=True):
+        codes, messages = _map_unique(column, func)
+        reject(applies & pd.notna(messages), messages)
+        return codes
+
+    def number(column, applies=True):
+        # Text columns (a stray word in a CSV) are read per distinct value so
+        # only the unreadable rows fail, with the scalar float() message
+        if pd.api.types.is_numeric_dtype(column):
+            return column.to_numpy(dtype=float)
+        values, messages = _map_unique(column, float, np.nan)
+        reject(applies & pd.notna(messages), messages)
+        return values.astype(float)
+
+    # Checks run in the order MixInput.from_mix_data() reads the inputs
+    grade_code = classify(required('grade'), grade_index.__getitem__).astype(int)
+    if 'estimated_std_dev' in frame.columns:
+        estimated = number(frame['estimated_std_dev'])
+    else:
+        estimated = np.full(n, np.nan)
+    cement_code = classify(required('cement_type'), cement_class).astype(int)
+    max_wc = number(required('max_wc_ratio'))
+    max_size = required('max_aggregate_size')
+    slump = number(required('workability_slump'))
+    agg_code = classify(_batch_column(frame, 'aggregate_type'), aggregate_class).astype(int)
+    use_admixture = _batch_column(frame, 'use_admixture').astype(bool).to_numpy()
+    admix_code = classify(_batch_column(frame, 'admixture_type'), admixture_class, use_admixture)
+    admix_code = np.where(use_admixture, admix_code.astype(int), ADMIX_NONE)
+    min_cement = number(required('min_cement_content'))
+    zone = required('fine_agg_zone')
+    pumped = classify(_batch_column(frame, 'placing_method'), is_pumped).astype(bool)
+
+    # Admixture dosage and gravity only count where an admixture is used
+    admixed = admix_code != ADMIX_NONE
+    sg_cement = number(_batch_column(frame, 'specific_gravity_cement'))
+    sg_coarse = number(_batch_column(frame, 'specific_gravity_coarse_agg'))
+    sg_fine = number(_batch_column(frame, 'specific_gravity_fine_agg'))
+    admixture_percentage = number(_batch_column(frame, 'admixture_percentage'), admixed)
+    sg_admixture = number(_batch_column(frame, 'specific_gravity_admixture'), admixed)
+
+    # Unknown sizes and zones only fail in the aggregate proportions stage,
+    # and a missing exposure only when the results are collected
+    size_code = classify(max_size, SIZE_CODES.__getitem__).astype(int)
+    zone_code = classify(zone, ZONE_CODES.__getitem__).astype(int)
+    if 'exposure' not in frame.columns:
+        reject(np.ones(n, dtype=bool), str(KeyError('exposure')))
+
+    f_ck, std_dev, X = grade_arrays(grade_properties, grades)
+    std_dev = std_dev[grade_code]
+    fair_control = (_batch_column(frame, 'site_control') == 'Fair').to_numpy()
+
+    # An S established from cube results replaces the table value and the
+    # site control allowance, as in MixInput.design_std_dev()
+    has_estimate = ~np.isnan(estimated)
+    std_dev = np.where(has_estimate,
+                       np.maximum(estimated, std_dev - ESTIMATED_STD_DEV_MARGIN), std_dev)
+    fair_control = fair_control & ~has_estimate
+
+    return {
+        'success': ~failed,
+        'error': error,
+        'f_ck': f_ck[grade_code],
+        'std_dev': std_dev,
+        'X': X[grade_code],
+        'fair_control': fair_control,
+        'cement_code': cement_code,
+        'max_wc_ratio': max_wc,
+        'size_code': size_code,
+        'slump': slump,
+        'agg_code': agg_code,
+        'admix_code': admix_code,
+        'min_cement_content': min_cement,
+        'zone_code': zone_code,
+        'pumped': pumped,
+        'sg_cement': sg_cement,
+        'sg_coarse': sg_coarse,
+        'sg_fine': sg_fine,
+        'admixture_percentage': np.where(admixed, admixture_percentage, 0.0),
+        'sg_admixture': np.where(admixed, sg_admixture, SPECIFIC_GRAVITY_ADMIXTURE)
+    }
+
+def design_batch(inputs):
+    """Vectorized equivalent of ConcreteMixDesign.perform_full_design().
+
+    Takes a DataFrame (or a structured array / dict of columns) with one
+    mix per row, keyed like ``mix_data``, and returns a results frame with
+    the same index. Rows that would fail in the scalar path are returned
+    with ``success`` False and the scalar error message.
+    """
+    start = time.perf_counter()
+    frame = inputs if isinstance(inputs, pd.DataFrame) else pd.DataFrame(inputs)
+    parsed = parse_frame(frame, GRADE_PROPERTIES)
+    success = parsed.pop('success')
+    error = parsed.pop('error')
+
+    results = pd.DataFrame({
+        'success': success,
+        'error': error,
+        **design_arrays(**parsed),
+        'grade': _output_column(frame, 'grade'),
+        'exposure': _output_column(frame, 'exposure')
+    }, index=frame.index)
+    numeric = results.columns[2:-2]
+    results.loc[~success, numeric] = np.nan
+
+    if METRICS.enabled:
+        METRICS.record('design_batch', time.perf_counter() - start)
+        METRICS.increment('batch_rows', len(frame))
+        METRICS.increment('batch_failed_rows', int((~success).sum()))
+    return results
@@ -0,0 +1,64 @@
+"""Field batch weights corrected for aggregate moisture and absorption.
+
+Design masses of fine and coarse aggregate are saturated surface-dry
+(SSD). Aggregate in the stockpile holds a total moisture content m and
+absorbs up to a (both in % of oven-dry mass), so per m³ the plant weighs
+
+    wet aggregate = SSD * (1 + m) / (1 + a)
+    free water    = SSD * (m - a) / (1 + a)
+
+and adds the design water less the free water of both aggregates. A
+negative free water means dry aggregate that will take up mix water.
+
+Everything is NumPy arithmetic on precomputed dry masses, so one
+BatchCorrector converts single probe readings or whole arrays of them
+(one per truck, per mix, or per reading in a stream) in a few operations.
+"""
+
+import numpy as np
+
+class BatchCorrector:
+    """Per-truck batch weights for one or more designs.
+
+    ``fine_agg_mass``, ``coarse_agg_mass`` and ``water_content`` are the
+    design values per m³ (scalars, or arrays with one entry per design as
+    returned by design_batch); absorptions are in %.
+    """
+
+    def __init__(self, fine_agg_mass, coarse_agg_mass, water_content,
+                 fine_absorption, coarse_absorption):
+        self.water_content = np.asarray(water_content, dtype=float)
+        self.fine_absorption = np.asarray(fine_absorption, dtype=float)
+        self.coarse_absorption = np.asarray(coarse_absorption, dtype=float)
+        # Oven-dry masses, computed once per design
+        self._fine_dry = np.asarray(fine_agg_mass, dtype=float) / (1 + self.fine_absorption / 100)
+        self._coarse_dry = np.asarray(coarse_agg_mass, dtype=float) / (1 + self.coarse_absorption / 100)
+
+    @classmethod
+    def from_results(cls, results, fine_absorption, coarse_absorption):
+        """From a perform_full_design() dict or a design_batch() frame."""
+        return cls(results['fine_agg_mass'], results['coarse_agg_mass'],
+                   results['water_content'], fine_absorption, coarse_absorption)
+
+    def weights(self, fine_moisture, coarse_moisture, volume=1.0):
+        """Wet aggregate and added water masses (kg) for ``volume`` m³.
+
+        Moisture readings are total moisture in % of dry mass and broadcast
+        against the designs.
+        """
+        fine_moisture = np.asarray(fine_moisture, dtype=float) / 100
+        coarse_moisture = np.asarray(coarse_moisture, dtype=float) / 100
+        fine_free = self._fine_dry * (fine_moisture - self.fine_absorption / 100)
+        coarse_free = self._coarse_dry * (coarse_moisture - self.coarse_absorption / 100)
+        return {
+            'fine_agg': self._fine_dry * (1 + fine_moisture) * volume,
+            'coarse_agg': self._coarse_dry * (1 + coarse_moisture) * volume,
+            'water': (self.water_content - fine_free - coarse_free) * volume,
+            'free_water': (fine_free + coarse_free) * volume
+        }
+
+def field_batch_weights(results, fine_moisture, coarse_moisture, fine_absorption,
+                        coarse_absorption, volume=1.0):
+    """One-off form of BatchCorrector.from_results(...).weights(...)."""
+    corrector = BatchCorrector.from_results(results, fine_absorption, coarse_absorption)
+    return corrector.weights(fine_moisture, coarse_moisture, volume)
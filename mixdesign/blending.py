@@ -0,0 +1,214 @@
+"""Blending of aggregate stockpiles to IS 383 gradings.
+
+Each stockpile is described by its sieve analysis (% passing on the sieves
+of FINE_SIEVES or COARSE_SIEVES). A blend of stockpiles with weights w
+(w >= 0, sum w = 1) passes G w on each sieve. The solver minimizes the
+distance of G w to the middle of the target envelope, each sieve scaled by
+its half-width, which is a least-squares problem over the simplex.
+
+For every combination the problem is solved exactly by enumerating the
+faces of the simplex (at most 2^k - 1 small KKT systems, batched over all
+combinations with NumPy). Where the least-squares blend still falls
+outside the envelope, a grid over the simplex (refined around its best
+point) is searched for the blend with the smallest envelope violation.
+
+screen_blends() tries every combination of 1..3 stockpiles in one call,
+and blend_for_design() turns the best fine and coarse blends into masses
+per m³ for a design.
+"""
+
+import itertools
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+FINE_SIEVES = (10.0, 4.75, 2.36, 1.18, 0.6, 0.3, 0.15)
+
+# IS 383 Table 9, % passing (low, high) per FINE_SIEVES
+ZONE_ENVELOPES = {
+    'I': ((100, 100), (90, 100), (60, 95), (30, 70), (15, 34), (5, 20), (0, 10)),
+    'II': ((100, 100), (90, 100), (75, 100), (55, 90), (35, 59), (8, 30), (0, 10)),
+    'III': ((100, 100), (90, 100), (85, 100), (75, 100), (60, 79), (12, 40), (0, 10)),
+    'IV': ((100, 100), (95, 100), (95, 100), (90, 100), (80, 100), (15, 50), (0, 15))
+}
+
+COARSE_SIEVES = (80.0, 40.0, 20.0, 12.5, 10.0, 4.75, 2.36)
+
+# IS 383 graded coarse aggregate (single-sized for 10 mm), % passing per
+# COARSE_SIEVES; None where the size has no requirement
+COARSE_ENVELOPES = {
+    10: (None, None, (100, 100), (100, 100), (85, 100), (0, 20), (0, 5)),
+    20: (None, (100, 100), (95, 100), None, (25, 55), (0, 10), None),
+    40: ((100, 100), (95, 100), (30, 70), None, (10, 35), (0, 5), None)
+}
+
+# Grid resolution of the fallback search, by number of stockpiles; the best
+# grid point is refined on a lattice REFINE_STEPS times finer
+GRID_STEPS = {1: 1, 2: 200, 3: 50, 4: 25}
+GRID_CHUNK = 64
+REFINE_STEPS = 5
+
+ENVELOPE_TOLERANCE = 1e-6
+
+def envelope_arrays(envelope):
+    """Low, high and objective weight per sieve for an envelope table."""
+    low = np.array([limits[0] if limits else 0.0 for limits in envelope], dtype=float)
+    high = np.array([limits[1] if limits else 100.0 for limits in envelope], dtype=float)
+    # Sieves without a requirement do not pull the blend
+    weight = np.array([1.0 / max((limits[1] - limits[0]) / 2, 1.0) if limits else 0.0
+                       for limits in envelope])
+    return low, high, weight
+
+def violation(passing, low, high):
+    """Largest distance (% passing) outside the envelope, per blend."""
+    return np.maximum(np.maximum(low - passing, passing - high), 0.0).max(axis=-1)
+
+@lru_cache(maxsize=None)
+def simplex_grid(k, steps):
+    """All weight vectors of k stockpiles in multiples of 1/steps."""
+    points = [point + (steps - sum(point),)
+              for point in itertools.product(range(steps + 1), repeat=k - 1)
+              if sum(point) <= steps]
+    return np.array(points, dtype=float) / steps
+
+def _faces(k):
+    return [face for size in range(1, k + 1) for face in itertools.combinations(range(k), size)]
+
+def _least_squares(gradings, target, weight):
+    # Exact minimum of |weight * (G w - target)|² over the simplex for each
+    # combination: the optimum is the equality-constrained minimum on one
+    # face of the simplex, so solve every face and keep the best feasible one
+    n, k, _ = gradings.shape
+    best = np.full(n, np.inf)
+    weights = np.zeros((n, k))
+    scaled = gradings * weight
+    scaled_target = target * weight
+    for face in _faces(k):
+        A = scaled[:, face, :]
+        m = len(face)
+        kkt = np.zeros((n, m + 1, m + 1))
+        kkt[:, :m, :m] = 2 * A @ A.transpose(0, 2, 1)
+        kkt[:, :m, m] = 1.0
+        kkt[:, m, :m] = 1.0
+        rhs = np.concatenate([2 * A @ scaled_target, np.ones((n, 1))], axis=1)
+        # pinv copes with stockpiles that have identical gradings
+        w = (np.linalg.pinv(kkt) @ rhs[:, :, None])[:, :m, 0]
+        residual = np.einsum('nm,nms->ns', w, A) - scaled_target
+        objective = np.einsum('ns,ns->n', residual, residual)
+        better = (w.min(axis=1) >= -1e-12) & (objective < best - 1e-12)
+        best = np.where(better, objective, best)
+        weights[better] = 0.0
+        weights[np.ix_(better, face)] = np.clip(w[better], 0.0, None)
+    return weights / weights.sum(axis=1, keepdims=True)
+
+@lru_cache(maxsize=None)
+def _local_offsets(k, steps):
+    # Finer lattice spanning one grid step around a point, summing to zero
+    span = range(-REFINE_STEPS, REFINE_STEPS + 1)
+    offsets = [point + (-sum(point),) for point in itertools.product(span, repeat=k - 1)]
+    return np.array(offsets, dtype=float) / (steps * REFINE_STEPS)
+
+def _closest(candidates, gradings, low, high, target, weight):
+    # Candidate (n, points, k) with the smallest envelope violation, then
+    # closest to target; points outside the simplex are skipped
+    passing = np.einsum('npk,nks->nps', candidates, gradings)
+    valid = (candidates >= -1e-12).all(axis=-1)
+    missed = np.where(valid, violation(passing, low, high), np.inf)
+    distance = np.square((passing - target) * weight).sum(axis=-1)
+    closest = valid & (missed <= missed.min(axis=1, keepdims=True) + ENVELOPE_TOLERANCE)
+    best = np.where(closest, distance, np.inf).argmin(axis=1)
+    return candidates[np.arange(len(candidates)), best]
+
+def _grid_search(gradings, low, high, target, weight):
+    # Coarse simplex grid, then a finer lattice around the best grid point
+    n, k, _ = gradings.shape
+    steps = GRID_STEPS.get(k, 20)
+    grid = simplex_grid(k, steps)
+    offsets = _local_offsets(k, steps)
+    weights = np.empty((n, k))
+    for start in range(0, n, GRID_CHUNK):
+        chunk = gradings[start:start + GRID_CHUNK]
+        coarse = _closest(np.broadcast_to(grid, (len(chunk),) + grid.shape), chunk,
+                          low, high, target, weight)
+        weights[start:start + GRID_CHUNK] = _closest(
+            coarse[:, None, :] + offsets, chunk, low, high, target, weight)
+    return weights
+
+def solve_blends(gradings, envelope):
+    """Blend weights for a batch of stockpile combinations.
+
+    ``gradings`` is an (n, k, sieves) array of % passing, one row of k
+    stockpiles per combination; ``envelope`` a ZONE_ENVELOPES or
+    COARSE_ENVELOPES entry. Returns (weights (n, k), passing (n, sieves),
+    violation (n,)).
+    """
+    gradings = np.asarray(gradings, dtype=float)
+    low, high, weight = envelope_arrays(envelope)
+    target = (low + high) / 2
+
+    weights = _least_squares(gradings, target, weight)
+    passing = np.einsum('nk,nks->ns', weights, gradings)
+    missed = violation(passing, low, high)
+
+    outside = missed > ENVELOPE_TOLERANCE
+    if outside.any():
+        grid_weights = _grid_search(gradings[outside], low, high, target, weight)
+        grid_passing = np.einsum('nk,nks->ns', grid_weights, gradings[outside])
+        grid_missed = violation(grid_passing, low, high)
+        improved = grid_missed < missed[outside]
+        rows = np.flatnonzero(outside)[improved]
+        weights[rows] = grid_weights[improved]
+        passing[rows] = grid_passing[improved]
+        missed[rows] = grid_missed[improved]
+    return weights, passing, missed
+
+def screen_blends(stockpiles, envelope, sieves=FINE_SIEVES, max_stockpiles=3):
+    """Best blend of every combination of up to ``max_stockpiles`` stockpiles.
+
+    ``stockpiles`` maps a name to its sieve analysis on ``sieves``.
+    Returns a DataFrame, best first, with the stockpile names, their
+    weights, the blend's % passing per sieve, ``violation`` (0 when the
+    blend is within the envelope) and ``meets_envelope``.
+    """
+    names = list(stockpiles)
+    analyses = np.array([stockpiles[name] for name in names], dtype=float)
+    rows = []
+    for k in range(1, min(max_stockpiles, len(names)) + 1):
+        combinations = list(itertools.combinations(range(len(names)), k))
+        weights, passing, missed = solve_blends(analyses[np.array(combinations)], envelope)
+        for combination, w, p, v in zip(combinations, weights, passing, missed):
+            rows.append({
+                'stockpiles': tuple(names[i] for i in combination),
+                'weights': tuple(float(x) for x in w),
+                **{f'passing_{sieve:g}': float(x) for sieve, x in zip(sieves, p)},
+                'violation': float(v),
+                'size': k
+            })
+    frame = pd.DataFrame(rows)
+    frame['meets_envelope'] = frame['violation'] <= ENVELOPE_TOLERANCE
+    # Compliant blends first, preferring fewer stockpiles
+    return frame.sort_values(['violation', 'size'], kind='stable').reset_index(drop=True)
+
+def blend_for_design(results, fine_stockpiles, coarse_stockpiles, fine_agg_zone,
+                     max_aggregate_size, max_stockpiles=3):
+    """Stockpile masses per m³ for a perform_full_design() result.
+
+    The best fine blend for ``fine_agg_zone`` supplies ``fine_agg_mass``
+    and the best coarse blend for ``max_aggregate_size`` supplies
+    ``coarse_agg_mass``, keeping the design's coarse aggregate volume.
+    Returns a dict with both blends and ``masses`` by stockpile name.
+    """
+    fine = screen_blends(fine_stockpiles, ZONE_ENVELOPES[fine_agg_zone],
+                         FINE_SIEVES, max_stockpiles).iloc[0]
+    coarse = screen_blends(coarse_stockpiles, COARSE_ENVELOPES[max_aggregate_size],
+                           COARSE_SIEVES, max_stockpiles).iloc[0]
+    masses = {}
+    for blend, mass in ((fine, results['fine_agg_mass']), (coarse, results['coarse_agg_mass'])):
+        for name, weight in zip(blend['stockpiles'], blend['weights']):
+            masses[name] = masses.get(name, 0.0) + weight * mass
+    return {
+        'fine': fine.to_dict(),
+        'coarse': coarse.to_dict(),
+        'masses': masses
+    }
@@ -0,0 +1,61 @@
+"""Memoized design results."""
+
+import threading
+from collections import OrderedDict
+
+from .core import GRADE_PROPERTIES, ConcreteMixDesign, design_key
+
+
+class DesignCache:
+    """Thread-safe LRU cache of perform_full_design() results."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()
+        self._lock = threading.Lock()
+        self._grade_properties = GRADE_PROPERTIES
+
+    def design(self, params):
+        try:
+            key = design_key(params, self._grade_properties)
+        except Exception:
+            key = None
+
+        if key is not None:
+            with self._lock:
+                results = self._results.get(key)
+                if results is not None:
+                    self._results.move_to_end(key)
+                    self.hits += 1
+                    return dict(results)
+                self.misses += 1
+
+        designer = ConcreteMixDesign()
+        designer.set_input_parameters(params)
+        results = designer.perform_full_design()
+
+        # Failed designs are not cached so the error is always reported fresh
+        if key is not None and results['success']:
+            with self._lock:
+                self._results[key] = results
+                self._results.move_to_end(key)
+                while len(self._results) > self.maxsize:
+                    self._results.popitem(last=False)
+        return dict(results)
+
+    def info(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'size': len(self._results),
+                'maxsize': self.maxsize
+            }
+
+    def clear(self):
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
@@ -0,0 +1,208 @@
+"""Headless batch runner for mix design requests.
+
+Streams a CSV or Parquet file of mix requests (columns named like the
+``mix_data`` keys) through the design engine in fixed-size chunks, spreads
+the chunks over a process pool and writes the results incrementally, so
+memory stays bounded however large the input is.
+
+    python -m mixdesign.cli requests.csv designs.parquet --chunk-size 50000 --workers 4
+"""
+
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .batch import design_batch
+from .core import EXPOSURE_OPTIONS, RESULT_KEYS
+from .metrics import METRICS
+
+def read_chunks(path, chunk_size):
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size)
+
+# Parquet types of the mix_data inputs and design results whose pandas
+# dtype depends on the chunk: a column blank in every row of a chunk reads
+# as float, and results are all blank in a chunk where every row fails.
+# Other numeric columns are written as double and other columns as string,
+# so the first chunk's dtypes never fix a narrower schema.
+STRING_COLUMNS = (
+    'grade', 'exposure', 'cement_type', 'aggregate_type', 'admixture_type', 'fine_agg_zone',
+    'site_control', 'placing_method', 'error'
+)
+BOOL_COLUMNS = ('use_admixture', 'success')
+FLOAT_COLUMNS = (
+    *RESULT_KEYS, 'std_dev', 'wc_ratio_adjusted', 'max_wc_ratio', 'min_cement_content',
+    'workability_slump', 'estimated_std_dev', 'specific_gravity_cement',
+    'specific_gravity_coarse_agg', 'specific_gravity_fine_agg', 'admixture_percentage',
+    'specific_gravity_admixture'
+)
+
+def parquet_schema(frame):
+    import pyarrow as pa
+    fields = []
+    for name, dtype in frame.dtypes.items():
+        if name in STRING_COLUMNS:
+            kind = pa.string()
+        elif name in BOOL_COLUMNS or pd.api.types.is_bool_dtype(dtype):
+            kind = pa.bool_()
+        elif name in FLOAT_COLUMNS:
+            kind = pa.float64()
+        elif pd.api.types.is_numeric_dtype(dtype) and not frame[name].isna().all():
+            kind = pa.float64()
+        else:
+            kind = pa.string()
+        fields.append(pa.field(name, kind))
+    return pa.schema(fields)
+
+class ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._started = False
+
+    def write(self, frame):
+        if self.parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, parquet_schema(frame))
+            schema = self._writer.schema
+            # Strings are converted in pandas: Arrow will not cast a float
+            # (all-blank) or numeric column to string itself
+            frame = frame.astype({name: 'string' for name in schema.names
+                                  if schema.field(name).type == pa.string()})
+            # An unreadable number in an input column has already failed its
+            # row; it is written blank rather than failing the whole file
+            for name in schema.names:
+                if (schema.field(name).type == pa.float64()
+                        and not pd.api.types.is_numeric_dtype(frame[name])):
+                    frame[name] = pd.to_numeric(frame[name], errors='coerce')
+            self._writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        else:
+            frame.to_csv(self.path, mode='a' if self._started else 'w',
+                         header=not self._started, index=False)
+        self._started = True
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def design_chunk(chunk):
+    # ERP exports carry the exposure class only; fill the IS 456 limits.
+    # Without an exposure column every row fails in design_batch().
+    if 'exposure' in chunk.columns:
+        for column, key in (('max_wc_ratio', 'max_wc'), ('min_cement_content', 'min_cement')):
+            limits = chunk['exposure'].map(lambda e: EXPOSURE_OPTIONS.get(e, {}).get(key))
+            if column in chunk.columns:
+                chunk[column] = chunk[column].fillna(limits)
+            else:
+                chunk[column] = limits
+
+    results = design_batch(chunk).drop(columns=['grade', 'exposure'])
+    results['error'] = results['error'].fillna('')
+    return pd.concat([chunk, results], axis=1)
+
+def design_chunk_with_metrics(chunk):
+    # Worker-side metrics are returned with the results and merged by the
+    # parent process
+    METRICS.enable()
+    METRICS.reset()
+    results = design_chunk(chunk)
+    return results, METRICS.snapshot()
+
+def map_in_order(func, jobs, workers):
+    """Yield func(*job) for each argument tuple in ``jobs``, in order.
+
+    With more than one worker the calls run on a process pool, holding at
+    most two jobs per worker in flight so memory stays bounded.
+    """
+    if workers <= 1:
+        for job in jobs:
+            yield func(*job)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for job in jobs:
+            pending.append(pool.submit(func, *job))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def run(input_path, output_path, chunk_size=50000, workers=None, progress=True, metrics=False):
+    """Design every row of input_path into output_path; returns a stats dict."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if metrics:
+        METRICS.enable()
+    writer = ChunkWriter(output_path)
+    rows = failed = 0
+    start = time.perf_counter()
+
+    def collect(results):
+        nonlocal rows, failed
+        if metrics:
+            if workers > 1:
+                results, snapshot = results
+                METRICS.merge(snapshot)
+            METRICS.call('write_chunk', writer.write, results)
+        else:
+            writer.write(results)
+        rows += len(results)
+        failed += int((~results['success']).sum())
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"{rows} rows, {rows / elapsed:,.0f} rows/s", file=sys.stderr)
+
+    func = design_chunk_with_metrics if metrics and workers > 1 else design_chunk
+    try:
+        jobs = ((chunk,) for chunk in read_chunks(input_path, chunk_size))
+        for results in map_in_order(func, jobs, workers):
+            collect(results)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'failed': failed,
+        'seconds': elapsed,
+        'rows_per_second': rows / elapsed if elapsed > 0 else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch concrete mix design as per IS 10262:2019')
+    parser.add_argument('input', help='CSV or Parquet file of mix requests')
+    parser.add_argument('output', help='CSV or Parquet file to write results to')
+    parser.add_argument('--chunk-size', type=int, default=50000, help='rows per chunk (default: 50000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes; 1 runs in-process (default: CPU count)')
+    parser.add_argument('--quiet', action='store_true', help='only print the final summary')
+    parser.add_argument('--metrics', metavar='PATH',
+                        help='write pipeline metrics to PATH (.prom for Prometheus text, else JSON)')
+    args = parser.parse_args(argv)
+
+    stats = run(args.input, args.output, args.chunk_size, args.workers,
+                progress=not args.quiet, metrics=bool(args.metrics))
+    print(f"Designed {stats['rows']} rows in {stats['seconds']:.2f} s "
+          f"({stats['rows_per_second']:,.0f} rows/s), {stats['failed']} failed")
+    if args.metrics:
+        with open(args.metrics, 'w') as handle:
+            if args.metrics.endswith('.prom'):
+                handle.write(METRICS.to_prometheus())
+            else:
+                handle.write(METRICS.to_json(indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
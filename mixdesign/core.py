@@ -0,0 +1,463 @@
+"""IS 10262:2019 mix design engine.
+
+Standard library only, so batch workers and services can import it without
+pulling in the web UI.
+"""
+
+import time
+from bisect import bisect_left
+from functools import lru_cache
+
+from .metrics import METRICS
+
+# Cement classes for the w/c ratio curves
+CEMENT_53 = 0
+CEMENT_43 = 1
+CEMENT_OTHER = 2
+
+# Target strength breakpoints (upper bounds, inclusive) and the w/c ratio for
+# each interval, indexed by cement class
+WC_BREAKPOINTS = (
+    (30, 40, 50, 60),
+    (25, 35, 45),
+    (20, 30, 40)
+)
+
+WC_RATIOS = (
+    (0.50, 0.45, 0.40, 0.35, 0.30),
+    (0.50, 0.45, 0.40, 0.35),
+    (0.55, 0.50, 0.45, 0.40)
+)
+
+# Maximum aggregate sizes; SIZE_OTHER falls back to the 20 mm water and air
+# values but has no coarse aggregate volume
+AGGREGATE_SIZES = (10, 20, 40)
+SIZE_CODES = {size: code for code, size in enumerate(AGGREGATE_SIZES)}
+SIZE_OTHER = len(AGGREGATE_SIZES)
+
+FINE_AGG_ZONES = ('I', 'II', 'III', 'IV')
+ZONE_CODES = {zone: code for code, zone in enumerate(FINE_AGG_ZONES)}
+ZONE_OTHER = -1
+
+# Indexed by size code
+BASE_WATER = (208, 186, 165, 186)
+AIR_CONTENT = (1.5, 1.0, 0.8, 1.0)
+
+# Indexed by [size code][zone code]
+BASE_COARSE_VOLUME = (
+    (0.48, 0.50, 0.52, 0.54),
+    (0.60, 0.62, 0.64, 0.66),
+    (0.69, 0.71, 0.72, 0.73)
+)
+
+# Aggregate shape classes and the water reduction (kg/m³) for each
+AGG_ANGULAR = 0
+AGG_SUB_ANGULAR = 1
+AGG_GRAVEL_CRUSHED = 2
+AGG_ROUNDED = 3
+AGG_REDUCTION = (0, 10, 15, 20)
+
+# Admixture classes and the water reduction (fraction) for each
+ADMIX_NONE = 0
+ADMIX_SUPERPLASTICIZER = 1
+ADMIX_PCE = 2
+ADMIX_PLASTICIZER = 3
+ADMIX_OTHER = 4
+ADMIX_WATER_REDUCTION = (0.0, 0.23, 0.30, 0.15, 0.10)
+
+# Input domains offered by the app
+GRADES = ['M10', 'M15', 'M20', 'M25', 'M30', 'M35', 'M40', 'M45', 'M50',
+          'M55', 'M60', 'M65', 'M70', 'M75', 'M80']
+
+# Characteristic strength, assumed standard deviation (IS 10262 Table 2)
+# and the X factor (Table 1) per grade; shared by every designer
+GRADE_PROPERTIES = {
+    'M10': {'f_ck': 10, 'std_dev': 3.5, 'X': 5.0},
+    'M15': {'f_ck': 15, 'std_dev': 3.5, 'X': 5.0},
+    'M20': {'f_ck': 20, 'std_dev': 4.0, 'X': 5.5},
+    'M25': {'f_ck': 25, 'std_dev': 4.0, 'X': 5.5},
+    'M30': {'f_ck': 30, 'std_dev': 5.0, 'X': 6.5},
+    'M35': {'f_ck': 35, 'std_dev': 5.0, 'X': 6.5},
+    'M40': {'f_ck': 40, 'std_dev': 5.0, 'X': 6.5},
+    'M45': {'f_ck': 45, 'std_dev': 5.0, 'X': 6.5},
+    'M50': {'f_ck': 50, 'std_dev': 5.0, 'X': 6.5},
+    'M55': {'f_ck': 55, 'std_dev': 5.0, 'X': 6.5},
+    'M60': {'f_ck': 60, 'std_dev': 5.0, 'X': 6.5},
+    'M65': {'f_ck': 65, 'std_dev': 6.0, 'X': 8.0},
+    'M70': {'f_ck': 70, 'std_dev': 6.0, 'X': 8.0},
+    'M75': {'f_ck': 75, 'std_dev': 6.0, 'X': 8.0},
+    'M80': {'f_ck': 80, 'std_dev': 6.0, 'X': 8.0}
+}
+
+EXPOSURE_OPTIONS = {
+    'Mild': {'max_wc': 0.55, 'min_cement': 220, 'desc': 'Protected against weather'},
+    'Moderate': {'max_wc': 0.50, 'min_cement': 240, 'desc': 'Sheltered from heavy rain'},
+    'Severe': {'max_wc': 0.45, 'min_cement': 320, 'desc': 'Exposed to rain, freezing'},
+    'Very Severe': {'max_wc': 0.40, 'min_cement': 340, 'desc': 'Coastal, corrosive environment'},
+    'Extreme': {'max_wc': 0.35, 'min_cement': 360, 'desc': 'Marine, industrial zones'}
+}
+
+CEMENT_TYPES = [
+    'OPC 33 Grade conforming to IS 269',
+    'OPC 43 Grade conforming to IS 269',
+    'OPC 53 Grade conforming to IS 269',
+    'PPC conforming to IS 1489 (Part 1)',
+    'PSC conforming to IS 1489 (Part 2)'
+]
+
+ADMIXTURE_TYPES = [
+    'Superplasticizer - normal',
+    'Superplasticizer - PCE based',
+    'Plasticizer',
+    'Retarder'
+]
+
+SITE_CONTROLS = ['Good', 'Fair']
+
+SLUMP_RANGE = (25, 150)
+
+# Material properties assumed when not given (the app's defaults)
+SPECIFIC_GRAVITY_CEMENT = 3.15
+SPECIFIC_GRAVITY_COARSE_AGG = 2.74
+SPECIFIC_GRAVITY_FINE_AGG = 2.65
+SPECIFIC_GRAVITY_ADMIXTURE = 1.145
+ADMIXTURE_PERCENTAGE = 1.0
+
+# Numeric outputs of perform_full_design(), in order, and those it rounds
+# to whole kg/m³
+RESULT_KEYS = (
+    'target_strength', 'wc_ratio', 'water_content', 'cement_content', 'vol_coarse',
+    'vol_fine', 'air_content', 'admixture_mass', 'vol_all_aggregate', 'fine_agg_mass',
+    'coarse_agg_mass'
+)
+INTEGER_RESULT_KEYS = ('water_content', 'cement_content', 'fine_agg_mass', 'coarse_agg_mass')
+
+# IS 10262 does not allow an S established from test results to be taken
+# below the assumed (Table 2) value less this margin, in N/mm²
+ESTIMATED_STD_DEV_MARGIN = 1.0
+
+@lru_cache(maxsize=256)
+def cement_class(cement_type):
+    if '53' in cement_type:
+        return CEMENT_53
+    elif '43' in cement_type:
+        return CEMENT_43
+    return CEMENT_OTHER
+
+@lru_cache(maxsize=256)
+def aggregate_class(agg_type):
+    agg_type = agg_type.lower()
+    if 'sub-angular' in agg_type:
+        return AGG_SUB_ANGULAR
+    elif 'gravel with some crushed' in agg_type:
+        return AGG_GRAVEL_CRUSHED
+    elif 'rounded' in agg_type:
+        return AGG_ROUNDED
+    return AGG_ANGULAR
+
+@lru_cache(maxsize=256)
+def admixture_class(admix_type):
+    admix_type = admix_type.lower()
+    if 'superplasticizer' in admix_type:
+        if 'pce' in admix_type:
+            return ADMIX_PCE
+        return ADMIX_SUPERPLASTICIZER
+    elif 'plasticizer' in admix_type:
+        return ADMIX_PLASTICIZER
+    return ADMIX_OTHER
+
+@lru_cache(maxsize=256)
+def is_pumped(placing_method):
+    return 'pump' in placing_method.lower()
+
+def _blank(value):
+    # Empty cells arrive as None, or NaN from pandas and CSV readers (the
+    # only value not equal to itself)
+    return value is None or value != value
+
+def _required(mix_data, key):
+    value = mix_data[key]
+    if _blank(value):
+        raise KeyError(key)
+    return value
+
+def _optional(mix_data, key, default):
+    value = mix_data.get(key, default)
+    return default if _blank(value) else value
+
+def _number(value):
+    # Numeric inputs read from text (CSV columns with a stray word, JSON
+    # strings) may still be strings; anything unreadable raises ValueError
+    return float(value) if isinstance(value, str) else value
+
+def water_cement_ratio(cement_code, target_strength):
+    index = bisect_left(WC_BREAKPOINTS[cement_code], target_strength)
+    return WC_RATIOS[cement_code][index]
+
+class MixInput:
+    """Design inputs parsed once from ``mix_data`` into table codes."""
+
+    __slots__ = (
+        'grade', 'exposure', 'f_ck', 'std_dev', 'X', 'fair_control', 'estimated_std_dev',
+        'cement_code', 'max_wc_ratio', 'max_aggregate_size', 'size_code',
+        'workability_slump', 'agg_code', 'admix_code', 'min_cement_content',
+        'fine_agg_zone', 'zone_code', 'pumped', 'sg_cement', 'sg_coarse', 'sg_fine',
+        'admixture_percentage', 'sg_admixture'
+    )
+
+    @classmethod
+    def from_mix_data(cls, mix_data, grade_properties):
+        # Required keys are read in the order the design stages use them, so
+        # a missing key fails exactly as the stage itself would. A blank value
+        # counts as missing; blank optional inputs take their defaults.
+        mix = cls()
+        mix.grade = _required(mix_data, 'grade')
+        properties = grade_properties[mix.grade]
+        mix.f_ck = properties['f_ck']
+        mix.std_dev = properties['std_dev']
+        mix.X = properties['X']
+        mix.fair_control = _optional(mix_data, 'site_control', 'Good') == 'Fair'
+        mix.estimated_std_dev = _number(_optional(mix_data, 'estimated_std_dev', None))
+        mix.cement_code = cement_class(_required(mix_data, 'cement_type'))
+        mix.max_wc_ratio = _number(_required(mix_data, 'max_wc_ratio'))
+        mix.max_aggregate_size = _required(mix_data, 'max_aggregate_size')
+        mix.size_code = SIZE_CODES.get(mix.max_aggregate_size, SIZE_OTHER)
+        mix.workability_slump = _number(_required(mix_data, 'workability_slump'))
+        mix.agg_code = aggregate_class(_optional(mix_data, 'aggregate_type', 'Crushed angular aggregate'))
+        if _optional(mix_data, 'use_admixture', False):
+            mix.admix_code = admixture_class(
+                _optional(mix_data, 'admixture_type', 'Superplasticizer - normal'))
+        else:
+            mix.admix_code = ADMIX_NONE
+        mix.min_cement_content = _number(_required(mix_data, 'min_cement_content'))
+        mix.fine_agg_zone = _required(mix_data, 'fine_agg_zone')
+        mix.zone_code = ZONE_CODES.get(mix.fine_agg_zone, ZONE_OTHER)
+        mix.pumped = is_pumped(_optional(mix_data, 'placing_method', 'Chute (Non pumpable)'))
+        mix.exposure = mix_data.get('exposure')
+        mix.sg_cement = _number(_optional(mix_data, 'specific_gravity_cement', SPECIFIC_GRAVITY_CEMENT))
+        mix.sg_coarse = _number(_optional(mix_data, 'specific_gravity_coarse_agg',
+                                         SPECIFIC_GRAVITY_COARSE_AGG))
+        mix.sg_fine = _number(_optional(mix_data, 'specific_gravity_fine_agg', SPECIFIC_GRAVITY_FINE_AGG))
+        # Without an admixture its dosage and gravity do not enter the design
+        if mix.admix_code == ADMIX_NONE:
+            mix.admixture_percentage = 0.0
+            mix.sg_admixture = SPECIFIC_GRAVITY_ADMIXTURE
+        else:
+            mix.admixture_percentage = _number(_optional(mix_data, 'admixture_percentage',
+                                                         ADMIXTURE_PERCENTAGE))
+            mix.sg_admixture = _number(_optional(mix_data, 'specific_gravity_admixture',
+                                                 SPECIFIC_GRAVITY_ADMIXTURE))
+        return mix
+
+    def design_std_dev(self):
+        # An S established from cube results already reflects site control
+        if self.estimated_std_dev is not None:
+            return max(self.estimated_std_dev, self.std_dev - ESTIMATED_STD_DEV_MARGIN)
+        if self.fair_control:
+            return self.std_dev + 1.0
+        return self.std_dev
+
+    def key(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+class ConcreteMixDesign:
+    def __init__(self):
+        self.mix_data = {}
+        self._input = None
+        self._input_source = None
+        self.grade_properties = GRADE_PROPERTIES
+    
+    def set_input_parameters(self, params):
+        self.mix_data.update(params)
+        self._input = None
+    
+    def parsed_input(self):
+        # Inputs are parsed once and cached until set_input_parameters() or a
+        # new mix_data dict; edit the inputs in place only through those
+        if self._input is None or self._input_source is not self.mix_data:
+            self._input = MixInput.from_mix_data(self.mix_data, self.grade_properties)
+            self._input_source = self.mix_data
+        return self._input
+    
+    def calculate_target_strength(self):
+        mix = self.parsed_input()
+        
+        S = mix.design_std_dev()
+        
+        f_ck1 = mix.f_ck + 1.65 * S
+        f_ck2 = mix.f_ck + mix.X
+        
+        target_strength = max(f_ck1, f_ck2)
+        
+        self.mix_data['target_strength'] = target_strength
+        self.mix_data['std_dev'] = S
+        
+        return target_strength
+    
+    def get_air_content(self):
+        return AIR_CONTENT[self.parsed_input().size_code] / 100
+    
+    def select_water_cement_ratio(self, target_strength):
+        mix = self.parsed_input()
+        
+        wc_ratio = water_cement_ratio(mix.cement_code, target_strength)
+        
+        if wc_ratio > mix.max_wc_ratio:
+            wc_ratio = mix.max_wc_ratio
+        
+        self.mix_data['wc_ratio'] = wc_ratio
+        return wc_ratio
+    
+    def calculate_water_content(self):
+        mix = self.parsed_input()
+        
+        water_50mm_agg = BASE_WATER[mix.size_code] - AGG_REDUCTION[mix.agg_code]
+        
+        slump_adjustment = ((mix.workability_slump - 50) / 25) * 0.03
+        water_for_slump = water_50mm_agg * (1 + slump_adjustment)
+        
+        final_water = water_for_slump * (1 - ADMIX_WATER_REDUCTION[mix.admix_code])
+        
+        return round(final_water)
+    
+    def calculate_cement_content(self, water_content, wc_ratio):
+        cement_content = water_content / wc_ratio
+        min_cement_content = self.parsed_input().min_cement_content
+        
+        if cement_content < min_cement_content:
+            cement_content = min_cement_content
+            wc_ratio = water_content / cement_content
+            self.mix_data['wc_ratio'] = wc_ratio
+        
+        return round(cement_content)
+    
+    def calculate_aggregate_proportions(self, wc_ratio):
+        mix = self.parsed_input()
+        
+        if mix.size_code == SIZE_OTHER:
+            raise KeyError(mix.max_aggregate_size)
+        if mix.zone_code == ZONE_OTHER:
+            raise KeyError(mix.fine_agg_zone)
+        vol_coarse_base = BASE_COARSE_VOLUME[mix.size_code][mix.zone_code]
+        
+        wc_difference = 0.50 - wc_ratio
+        adjustment = (wc_difference / 0.05) * 0.01
+        vol_coarse_adjusted = vol_coarse_base + adjustment
+        
+        if mix.pumped:
+            reduction = 0.10
+            vol_coarse_adjusted = vol_coarse_adjusted * (1 - reduction)
+        
+        vol_fine = 1 - vol_coarse_adjusted
+        
+        return vol_coarse_adjusted, vol_fine
+    
+    def calculate_mix_masses(self, water_content, cement_content, vol_coarse, vol_fine, air_content):
+        # IS 10262 absolute volumes per m³ of concrete; aggregate masses are
+        # saturated surface-dry
+        mix = self.parsed_input()
+        
+        admixture_mass = cement_content * mix.admixture_percentage / 100
+        
+        vol_cement = cement_content / (mix.sg_cement * 1000)
+        vol_water = water_content / 1000
+        vol_admixture = admixture_mass / (mix.sg_admixture * 1000)
+        vol_all_aggregate = 1 - air_content - (vol_cement + vol_water + vol_admixture)
+        
+        fine_agg_mass = vol_all_aggregate * vol_fine * mix.sg_fine * 1000
+        coarse_agg_mass = vol_all_aggregate * vol_coarse * mix.sg_coarse * 1000
+        
+        return admixture_mass, vol_all_aggregate, round(fine_agg_mass), round(coarse_agg_mass)
+    
+    def perform_full_design(self):
+        if METRICS.enabled:
+            return self._perform_instrumented_design()
+        try:
+            target_strength = self.calculate_target_strength()
+            wc_ratio = self.select_water_cement_ratio(target_strength)
+            water_content = self.calculate_water_content()
+            cement_content = self.calculate_cement_content(water_content, wc_ratio)
+            vol_coarse, vol_fine = self.calculate_aggregate_proportions(wc_ratio)
+            air_content = self.get_air_content()
+            masses = self.calculate_mix_masses(water_content, cement_content,
+                                               vol_coarse, vol_fine, air_content)
+            
+            return self._results(target_strength, wc_ratio, water_content, cement_content,
+                                 vol_coarse, vol_fine, air_content, masses)
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_type': type(e).__name__
+            }
+    
+    def _perform_instrumented_design(self):
+        # Same stages as perform_full_design(), timed one by one and with
+        # failures attributed to the stage that raised
+        call = METRICS.call
+        start = time.perf_counter()
+        stage = 'parse_input'
+        try:
+            call(stage, self.parsed_input)
+            stage = 'calculate_target_strength'
+            target_strength = call(stage, self.calculate_target_strength)
+            stage = 'select_water_cement_ratio'
+            wc_ratio = call(stage, self.select_water_cement_ratio, target_strength)
+            stage = 'calculate_water_content'
+            water_content = call(stage, self.calculate_water_content)
+            stage = 'calculate_cement_content'
+            cement_content = call(stage, self.calculate_cement_content, water_content, wc_ratio)
+            stage = 'calculate_aggregate_proportions'
+            vol_coarse, vol_fine = call(stage, self.calculate_aggregate_proportions, wc_ratio)
+            stage = 'get_air_content'
+            air_content = call(stage, self.get_air_content)
+            stage = 'calculate_mix_masses'
+            masses = call(stage, self.calculate_mix_masses, water_content, cement_content,
+                          vol_coarse, vol_fine, air_content)
+            stage = 'results'
+            results = self._results(target_strength, wc_ratio, water_content, cement_content,
+                                    vol_coarse, vol_fine, air_content, masses)
+            
+        except Exception as e:
+            METRICS.record_error(stage, e)
+            results = {
+                'success': False,
+                'error': str(e),
+                'error_type': type(e).__name__,
+                'stage': stage
+            }
+        
+        METRICS.record('perform_full_design', time.perf_counter() - start)
+        return results
+    
+    def _results(self, target_strength, wc_ratio, water_content, cement_content,
+                 vol_coarse, vol_fine, air_content, masses):
+        admixture_mass, vol_all_aggregate, fine_agg_mass, coarse_agg_mass = masses
+        return {
+            'success': True,
+            'target_strength': target_strength,
+            'wc_ratio': wc_ratio,
+            'water_content': water_content,
+            'cement_content': cement_content,
+            'vol_coarse': vol_coarse,
+            'vol_fine': vol_fine,
+            'air_content': air_content,
+            'admixture_mass': admixture_mass,
+            'vol_all_aggregate': vol_all_aggregate,
+            'fine_agg_mass': fine_agg_mass,
+            'coarse_agg_mass': coarse_agg_mass,
+            'grade': self.mix_data['grade'],
+            'exposure': self.mix_data['exposure']
+        }
+
+def design_key(params, grade_properties=None):
+    """Canonical, hashable key for a set of design inputs.
+
+    Inputs that parse to the same table codes (e.g. two spellings of the same
+    cement type) share a key. Raises like perform_full_design() would if the
+    inputs are incomplete.
+    """
+    if grade_properties is None:
+        grade_properties = GRADE_PROPERTIES
+    return MixInput.from_mix_data(params, grade_properties).key()
@@ -0,0 +1,143 @@
+"""Incremental recomputation of design stages.
+
+The stages of perform_full_design() form a small dependency graph: each
+stage reads some ``mix_data`` keys and the outputs of upstream stages.
+IncrementalDesign caches every stage's output and, when an input changes,
+invalidates only the stages downstream of it. Moving the slump, for
+example, recomputes water and cement content but not the target strength,
+w/c ratio or aggregate volumes.
+"""
+
+from .core import ConcreteMixDesign
+
+# stage: (mix_data keys it reads, upstream stages), in evaluation order
+STAGES = {
+    'target_strength': (('grade', 'site_control', 'estimated_std_dev'), ()),
+    'wc_ratio': (('cement_type', 'max_wc_ratio'), ('target_strength',)),
+    'water_content': (('max_aggregate_size', 'workability_slump', 'aggregate_type',
+                       'use_admixture', 'admixture_type'), ()),
+    'cement_content': (('min_cement_content',), ('water_content', 'wc_ratio')),
+    'aggregate_proportions': (('max_aggregate_size', 'fine_agg_zone', 'placing_method'),
+                              ('wc_ratio',)),
+    'air_content': (('max_aggregate_size',), ()),
+    'mix_masses': (('specific_gravity_cement', 'specific_gravity_coarse_agg',
+                    'specific_gravity_fine_agg', 'use_admixture', 'admixture_type',
+                    'admixture_percentage', 'specific_gravity_admixture'),
+                   ('water_content', 'cement_content', 'aggregate_proportions', 'air_content'))
+}
+
+def _downstream():
+    # stage -> stages that read its output, transitively
+    direct = {stage: set() for stage in STAGES}
+    for stage, (_, upstream) in STAGES.items():
+        for parent in upstream:
+            direct[parent].add(stage)
+
+    def collect(stage):
+        found = set()
+        for child in direct[stage]:
+            found |= {child} | collect(child)
+        return found
+
+    return {stage: collect(stage) for stage in STAGES}
+
+DOWNSTREAM = _downstream()
+
+INPUT_STAGES = {}
+for _stage, (_keys, _) in STAGES.items():
+    for _key in _keys:
+        INPUT_STAGES.setdefault(_key, set()).add(_stage)
+
+class IncrementalDesign:
+    """ConcreteMixDesign with per-stage caching and targeted invalidation."""
+
+    def __init__(self, params=None):
+        self.designer = ConcreteMixDesign()
+        self.evaluations = dict.fromkeys(STAGES, 0)
+        self._values = {}
+        self._dirty = set(STAGES)
+        if params:
+            self.update(params)
+
+    def update(self, params):
+        """Apply changed inputs; returns the set of invalidated stages."""
+        mix_data = self.designer.mix_data
+        changed = {key: value for key, value in params.items()
+                   if key not in mix_data or mix_data[key] != value}
+        if not changed:
+            return set()
+
+        invalidated = set()
+        for key in changed:
+            for stage in INPUT_STAGES.get(key, ()):
+                invalidated |= {stage} | DOWNSTREAM[stage]
+        self._dirty |= invalidated
+        self.designer.set_input_parameters(changed)
+        return invalidated
+
+    def _compute(self, stage):
+        designer = self.designer
+        values = self._values
+        if stage == 'target_strength':
+            return designer.calculate_target_strength()
+        elif stage == 'wc_ratio':
+            return designer.select_water_cement_ratio(values['target_strength'])
+        elif stage == 'water_content':
+            return designer.calculate_water_content()
+        elif stage == 'cement_content':
+            # Reset the w/c ratio the cement stage may back-adjust, as a full
+            # run would
+            designer.mix_data['wc_ratio'] = values['wc_ratio']
+            return designer.calculate_cement_content(values['water_content'], values['wc_ratio'])
+        elif stage == 'aggregate_proportions':
+            return designer.calculate_aggregate_proportions(values['wc_ratio'])
+        elif stage == 'air_content':
+            return designer.get_air_content()
+        vol_coarse, vol_fine = values['aggregate_proportions']
+        return designer.calculate_mix_masses(values['water_content'], values['cement_content'],
+                                             vol_coarse, vol_fine, values['air_content'])
+
+    def result(self):
+        """Same dict as perform_full_design(), recomputing only stale stages."""
+        stage = None
+        try:
+            for stage in STAGES:
+                if stage in self._dirty:
+                    self._values[stage] = self._compute(stage)
+                    self.evaluations[stage] += 1
+                    self._dirty.discard(stage)
+
+            stage = 'results'
+            values = self._values
+            vol_coarse, vol_fine = values['aggregate_proportions']
+            admixture_mass, vol_all_aggregate, fine_agg_mass, coarse_agg_mass = values['mix_masses']
+            return {
+                'success': True,
+                'target_strength': values['target_strength'],
+                'wc_ratio': values['wc_ratio'],
+                'water_content': values['water_content'],
+                'cement_content': values['cement_content'],
+                'vol_coarse': vol_coarse,
+                'vol_fine': vol_fine,
+                'air_content': values['air_content'],
+                'admixture_mass': admixture_mass,
+                'vol_all_aggregate': vol_all_aggregate,
+                'fine_agg_mass': fine_agg_mass,
+                'coarse_agg_mass': coarse_agg_mass,
+                'grade': self.designer.mix_data['grade'],
+                'exposure': self.designer.mix_data['exposure']
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e),
+                'error_type': type(e).__name__,
+                'stage': stage
+            }
+
+    def sweep(self, key, values):
+        """Yield (value, result) while varying one input."""
+        for value in values:
+            self.update({key: value})
+            yield value, self.result()
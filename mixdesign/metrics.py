@@ -0,0 +1,147 @@
+"""Optional instrumentation of the design pipeline.
+
+When enabled, perform_full_design() times each stage and counts its calls,
+failures are counted by stage and exception type, and registered caches
+report their hit ratios. Snapshots export as a dict/JSON or in the
+Prometheus text format. Disabled (the default), the only cost is one
+attribute check per design.
+
+    from mixdesign.metrics import METRICS
+    METRICS.enable()
+    ...
+    print(METRICS.to_prometheus())
+"""
+
+import json
+import threading
+import time
+
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._caches = {}
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        with self._lock:
+            self._calls = {}
+            self._seconds = {}
+            self._errors = {}
+            self._counters = {}
+
+    def call(self, stage, func, *args):
+        """Run one pipeline stage, timing it."""
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self._lock:
+            self._calls[stage] = self._calls.get(stage, 0) + 1
+            self._seconds[stage] = self._seconds.get(stage, 0.0) + seconds
+
+    def record_error(self, stage, error):
+        key = (stage, type(error).__name__)
+        with self._lock:
+            self._errors[key] = self._errors.get(key, 0) + 1
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def register_cache(self, name, cache):
+        """Report ``cache.info()`` (hits, misses, size, maxsize) in snapshots."""
+        self._caches[name] = cache
+
+    def snapshot(self):
+        with self._lock:
+            stages = {
+                stage: {
+                    'calls': calls,
+                    'seconds': self._seconds[stage],
+                    'mean_seconds': self._seconds[stage] / calls
+                }
+                for stage, calls in self._calls.items()
+            }
+            errors = [
+                {'stage': stage, 'type': error_type, 'count': count}
+                for (stage, error_type), count in sorted(self._errors.items(), key=str)
+            ]
+            counters = dict(self._counters)
+
+        caches = {}
+        for name, cache in self._caches.items():
+            info = cache.info()
+            lookups = info['hits'] + info['misses']
+            caches[name] = {**info, 'hit_ratio': info['hits'] / lookups if lookups else 0.0}
+
+        return {
+            'enabled': self.enabled,
+            'stages': stages,
+            'errors': errors,
+            'counters': counters,
+            'caches': caches
+        }
+
+    def merge(self, snapshot):
+        """Add the stage, error and counter totals of another snapshot, e.g.
+        one returned by a worker process."""
+        with self._lock:
+            for stage, stats in snapshot['stages'].items():
+                self._calls[stage] = self._calls.get(stage, 0) + stats['calls']
+                self._seconds[stage] = self._seconds.get(stage, 0.0) + stats['seconds']
+            for error in snapshot['errors']:
+                key = (error['stage'], error['type'])
+                self._errors[key] = self._errors.get(key, 0) + error['count']
+            for name, value in snapshot['counters'].items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix='mixdesign'):
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(val)}"' for key, val in labels.items())
+                lines.append(f'{prefix}_{name}{{{label_text}}} {value}' if label_text
+                             else f'{prefix}_{name} {value}')
+
+        stages = snapshot['stages']
+        metric('stage_calls_total', 'counter', 'Calls per design stage.',
+               [({'stage': stage}, stats['calls']) for stage, stats in stages.items()])
+        metric('stage_seconds_total', 'counter', 'Time spent per design stage.',
+               [({'stage': stage}, repr(stats['seconds'])) for stage, stats in stages.items()])
+        metric('errors_total', 'counter', 'Failures by stage and exception type.',
+               [({'stage': e['stage'], 'type': e['type']}, e['count']) for e in snapshot['errors']])
+        metric('events_total', 'counter', 'Pipeline event counters.',
+               [({'name': name}, value) for name, value in snapshot['counters'].items()])
+        caches = snapshot['caches']
+        metric('cache_hits_total', 'counter', 'Cache hits.',
+               [({'cache': name}, info['hits']) for name, info in caches.items()])
+        metric('cache_misses_total', 'counter', 'Cache misses.',
+               [({'cache': name}, info['misses']) for name, info in caches.items()])
+        metric('cache_size', 'gauge', 'Entries held in the cache.',
+               [({'cache': name}, info['size']) for name, info in caches.items()])
+        metric('cache_hit_ratio', 'gauge', 'Hits over lookups.',
+               [({'cache': name}, repr(info['hit_ratio'])) for name, info in caches.items()])
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# Process-wide registry used by the engine
+METRICS = Metrics()
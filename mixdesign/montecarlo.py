@@ -0,0 +1,247 @@
+"""Monte Carlo reliability analysis of a mix design.
+
+Samples site and material variability around one design and pushes the
+samples through the vectorized design equations in fixed-size chunks,
+keeping only running sums and fixed-bin histograms so memory stays flat
+however many samples are drawn. Chunks can be spread over processes.
+
+Each sample is one batch as delivered:
+
+- the site's actual standard deviation S (lognormal around the design S),
+- the delivered slump (normal around the design slump),
+- the admixture's actual water reduction (normal around the table value),
+- the specific gravities of cement, coarse and fine aggregate (normal
+  around the design values).
+
+For each sample the design is redone with those values, giving the
+distributions of target strength, w/c ratio, water and cement content and
+of the fine and coarse aggregate masses.
+The committed (nominal) mix is then checked against the sample: the water
+needed for the delivered slump raises or lowers its effective w/c ratio,
+Abrams' law f = A / B^(w/c) converts that into the mean strength actually
+achieved, and the sample counts as a shortfall when that strength is below
+the target strength the sample's S requires.
+
+The Abrams curve passes through the strength the IS 10262 w/c table
+credits to the nominal mix's adopted w/c ratio (see table_strength()), not
+through its target strength. A w/c ratio capped by the exposure limit, or
+lowered by the minimum cement content, therefore gives a stronger mix than
+the target, as it does on site.
+"""
+
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .core import ADMIX_NONE, ADMIX_WATER_REDUCTION, WC_BREAKPOINTS, WC_RATIOS, ConcreteMixDesign
+from .vectorized import design_arrays
+
+DEFAULT_VARIABILITY = {
+    'std_dev_cov': 0.20,
+    'slump_sd': 15.0,
+    'water_reduction_sd': 0.03,
+    'sg_cement_sd': 0.02,
+    'sg_aggregate_sd': 0.03,
+    'abrams_b': 14.0
+}
+
+# Fixed histogram bins per output, used for quantiles
+HISTOGRAM_BINS = {
+    'target_strength': np.linspace(0.0, 150.0, 3001),
+    'wc_ratio': np.linspace(0.0, 1.0, 2001),
+    'water_content': np.arange(0.0, 401.0),
+    'cement_content': np.arange(0.0, 1201.0),
+    'fine_agg_mass': np.arange(0.0, 2001.0),
+    'coarse_agg_mass': np.arange(0.0, 2001.0),
+    'achieved_strength': np.linspace(0.0, 150.0, 3001)
+}
+
+QUANTILES = (0.05, 0.50, 0.95)
+
+def _normal_cdf(x):
+    # Abramowitz & Stegun 7.1.26 (error < 1.5e-7), vectorized
+    z = np.abs(x) / math.sqrt(2.0)
+    t = 1.0 / (1.0 + 0.3275911 * z)
+    poly = t * (0.254829592 + t * (-0.284496736 + t * (1.421413741 + t * (-1.453152027 + t * 1.061405429))))
+    erf = 1.0 - poly * np.exp(-z * z)
+    return 0.5 * (1.0 + np.where(x < 0, -erf, erf))
+
+def table_strength(cement_code, wc_ratio, abrams_b):
+    """Mean strength the w/c table credits to ``wc_ratio``.
+
+    The table adopts each w/c ratio for target strengths up to its
+    breakpoint, so the ratio is taken to deliver that strength. Between
+    breakpoints the strength is interpolated along an Abrams curve, and
+    beyond the table it is extrapolated with ``abrams_b``.
+    """
+    points = list(zip(WC_RATIOS[cement_code], WC_BREAKPOINTS[cement_code]))
+    ratio, strength = points[0]
+    if wc_ratio >= ratio:
+        return strength * abrams_b ** (ratio - wc_ratio)
+    for next_ratio, next_strength in points[1:]:
+        if wc_ratio >= next_ratio:
+            share = (ratio - wc_ratio) / (ratio - next_ratio)
+            return strength * (next_strength / strength) ** share
+        ratio, strength = next_ratio, next_strength
+    return strength * abrams_b ** (ratio - wc_ratio)
+
+def _nominal(params):
+    designer = ConcreteMixDesign()
+    designer.set_input_parameters(params)
+    results = designer.perform_full_design()
+    if not results['success']:
+        raise ValueError(f"Design failed: {results['error']}")
+    return designer.parsed_input(), results, designer.mix_data['wc_ratio']
+
+def _sample_chunk(params, n, seed, variability):
+    mix, nominal, nominal_wc = _nominal(params)
+    rng = np.random.default_rng(seed)
+
+    design_std_dev = mix.design_std_dev()
+    cov = variability['std_dev_cov']
+    sigma = math.sqrt(math.log(1.0 + cov * cov))
+    std_dev = design_std_dev * rng.lognormal(-0.5 * sigma * sigma, sigma, n)
+
+    slump = np.clip(rng.normal(mix.workability_slump, variability['slump_sd'], n), 0.0, None)
+    if mix.admix_code == ADMIX_NONE:
+        water_reduction = np.zeros(n)
+    else:
+        water_reduction = np.clip(
+            rng.normal(ADMIX_WATER_REDUCTION[mix.admix_code], variability['water_reduction_sd'], n),
+            0.0, 0.5)
+
+    sg_cement = rng.normal(mix.sg_cement, variability['sg_cement_sd'], n)
+    sg_coarse = rng.normal(mix.sg_coarse, variability['sg_aggregate_sd'], n)
+    sg_fine = rng.normal(mix.sg_fine, variability['sg_aggregate_sd'], n)
+
+    def full(value, dtype=float):
+        return np.full(n, value, dtype=dtype)
+
+    # The sampled S already includes site control, so fair_control is off
+    design = design_arrays(
+        f_ck=full(mix.f_ck), std_dev=std_dev, X=full(mix.X), fair_control=full(False, bool),
+        cement_code=full(mix.cement_code, int), max_wc_ratio=full(mix.max_wc_ratio),
+        size_code=full(mix.size_code, int), slump=slump, agg_code=full(mix.agg_code, int),
+        admix_code=full(mix.admix_code, int), min_cement_content=full(mix.min_cement_content),
+        zone_code=full(mix.zone_code, int), pumped=full(mix.pumped, bool),
+        water_reduction=water_reduction, sg_cement=sg_cement, sg_coarse=sg_coarse,
+        sg_fine=sg_fine, admixture_percentage=mix.admixture_percentage,
+        sg_admixture=mix.sg_admixture)
+
+    abrams_b = variability['abrams_b']
+    effective_wc = design['water_content'] / nominal['cement_content']
+    anchor = table_strength(mix.cement_code, nominal_wc, abrams_b)
+    achieved = anchor * abrams_b ** (nominal_wc - effective_wc)
+
+    summary = _Summary()
+    summary.count = n
+    summary.add('target_strength', design['target_strength'])
+    summary.add('wc_ratio', design['wc_ratio_adjusted'])
+    summary.add('water_content', design['water_content'])
+    summary.add('cement_content', design['cement_content'])
+    summary.add('fine_agg_mass', design['fine_agg_mass'])
+    summary.add('coarse_agg_mass', design['coarse_agg_mass'])
+    summary.add('achieved_strength', achieved)
+    summary.below_target = int(np.count_nonzero(achieved < design['target_strength']))
+    summary.below_fck_sum = float(_normal_cdf((mix.f_ck - achieved) / std_dev).sum())
+    return summary
+
+class _Summary:
+    """Running sums and histograms for each sampled output."""
+
+    def __init__(self):
+        self.count = 0
+        self.sums = {}
+        self.histograms = {}
+        self.below_target = 0
+        self.below_fck_sum = 0.0
+
+    def add(self, name, values):
+        bins = HISTOGRAM_BINS[name]
+        sums = self.sums.setdefault(name, [0.0, 0.0, math.inf, -math.inf])
+        sums[0] += float(values.sum())
+        sums[1] += float(np.square(values).sum())
+        sums[2] = min(sums[2], float(values.min()))
+        sums[3] = max(sums[3], float(values.max()))
+        counts = np.bincount(np.clip(np.searchsorted(bins, values, side='right') - 1, 0, len(bins) - 1),
+                             minlength=len(bins))
+        self.histograms[name] = self.histograms.get(name, 0) + counts
+
+    def merge(self, other):
+        self.count += other.count
+        self.below_target += other.below_target
+        self.below_fck_sum += other.below_fck_sum
+        for name, (total, squares, low, high) in other.sums.items():
+            sums = self.sums.setdefault(name, [0.0, 0.0, math.inf, -math.inf])
+            sums[0] += total
+            sums[1] += squares
+            sums[2] = min(sums[2], low)
+            sums[3] = max(sums[3], high)
+            self.histograms[name] = self.histograms.get(name, 0) + other.histograms[name]
+
+    def distribution(self, name):
+        total, squares, low, high = self.sums[name]
+        mean = total / self.count
+        variance = max(squares / self.count - mean * mean, 0.0)
+        cumulative = np.cumsum(self.histograms[name])
+        bins = HISTOGRAM_BINS[name]
+        stats = {'mean': mean, 'std': math.sqrt(variance), 'min': low, 'max': high}
+        for q in QUANTILES:
+            index = int(np.searchsorted(cumulative, q * self.count, side='left'))
+            stats[f'p{round(q * 100):02d}'] = float(min(max(bins[index], low), high))
+        return stats
+
+def monte_carlo(params, samples=1_000_000, chunk_size=250_000, workers=1, seed=None, **variability):
+    """Reliability of the design for ``params`` (a ``mix_data`` dict).
+
+    Returns the nominal design, the distributions (mean, std, min, max and
+    5/50/95th percentiles) of the redesigned target strength, w/c ratio,
+    water and cement content, the aggregate masses and the achieved
+    strength, and:
+
+    - ``p_below_target``: share of samples whose achieved mean strength is
+      below the target strength their S requires,
+    - ``p_below_fck``: expected share of cubes below f_ck.
+
+    Keyword arguments override DEFAULT_VARIABILITY.
+    """
+    if samples < 1:
+        raise ValueError(f'samples must be at least 1, got {samples}')
+    if chunk_size < 1:
+        raise ValueError(f'chunk_size must be at least 1, got {chunk_size}')
+    unknown = set(variability) - set(DEFAULT_VARIABILITY)
+    if unknown:
+        raise TypeError(f"Unknown variability settings: {', '.join(sorted(unknown))}")
+    variability = {**DEFAULT_VARIABILITY, **variability}
+    _, nominal, _ = _nominal(params)
+
+    sizes = [chunk_size] * (samples // chunk_size)
+    if samples % chunk_size:
+        sizes.append(samples % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(params, size, child, variability) for size, child in zip(sizes, seeds)]
+
+    summary = _Summary()
+    if workers <= 1:
+        for job in jobs:
+            summary.merge(_sample_chunk(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for chunk in pool.map(_sample_chunk, *zip(*jobs)):
+                summary.merge(chunk)
+
+    return {
+        'samples': summary.count,
+        'nominal': nominal,
+        'variability': variability,
+        'p_below_target': summary.below_target / summary.count,
+        'p_below_fck': summary.below_fck_sum / summary.count,
+        'target_strength': summary.distribution('target_strength'),
+        'wc_ratio': summary.distribution('wc_ratio'),
+        'water_content': summary.distribution('water_content'),
+        'cement_content': summary.distribution('cement_content'),
+        'fine_agg_mass': summary.distribution('fine_agg_mass'),
+        'coarse_agg_mass': summary.distribution('coarse_agg_mass'),
+        'achieved_strength': summary.distribution('achieved_strength')
+    }
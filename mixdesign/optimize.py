@@ -0,0 +1,152 @@
+"""Cost-optimal mix search over cement, admixture and aggregate choices.
+
+Every allowed combination of cement type, admixture type and dosage,
+maximum aggregate size and fine aggregate zone is a candidate. Most are
+dominated and pruned before any design is computed:
+
+- cement types of the same strength class give the same design, so only
+  the cheapest of each class is kept;
+- likewise for admixture types with the same water reduction;
+- the w/c ratio, water and cement do not depend on the admixture dosage.
+  A higher dosage adds admixture mass, and its volume displaces the same
+  volume of aggregate. When admixture costs more per m³ of volume than
+  either aggregate (price x specific gravity), the extra admixture always
+  costs more than the aggregate it saves, so only the lowest allowed
+  dosage is kept; otherwise every dosage is designed.
+
+The survivors are designed in one vectorized batch. The exposure limits
+(max w/c, min cement) are applied by the design itself. Designs above the
+maximum cement content or with no room left for aggregate are dropped.
+The rest are ranked by cost per m³.
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from .batch import design_batch
+from .core import (
+    ADMIXTURE_TYPES, AGGREGATE_SIZES, CEMENT_TYPES, EXPOSURE_OPTIONS, FINE_AGG_ZONES,
+    SPECIFIC_GRAVITY_ADMIXTURE, SPECIFIC_GRAVITY_COARSE_AGG, SPECIFIC_GRAVITY_FINE_AGG,
+    admixture_class, cement_class
+)
+
+# IS 456 cl. 8.2.4.2 upper limit for cement content, kg/m³
+MAX_CEMENT_CONTENT = 450
+
+ADMIXTURE_DOSAGES = (0.5, 0.75, 1.0, 1.25, 1.5, 2.0)
+
+COST_COMPONENTS = {
+    'cement': 'cement_content',
+    'water': 'water_content',
+    'admixture': 'admixture_mass',
+    'fine_agg': 'fine_agg_mass',
+    'coarse_agg': 'coarse_agg_mass'
+}
+
+def _price_table(price, options):
+    # A single price applies to every option
+    if isinstance(price, dict):
+        return {option: price[option] for option in options if option in price}
+    return {option: price for option in options}
+
+def _cheapest_per_class(prices, classify):
+    best = {}
+    for option, price in prices.items():
+        code = classify(option)
+        if code not in best or price < prices[best[code]]:
+            best[code] = option
+    return list(best.values())
+
+def _lowest_dosage_is_cheapest(admixture_price, params, prices):
+    # Price per m³ of solid volume; the aggregate displaced is some mix of
+    # fine and coarse, so it can save at most the dearer of the two
+    admixture = admixture_price * params.get('specific_gravity_admixture', SPECIFIC_GRAVITY_ADMIXTURE)
+    aggregate = max(
+        prices.get('fine_agg', 0.0) * params.get('specific_gravity_fine_agg', SPECIFIC_GRAVITY_FINE_AGG),
+        prices.get('coarse_agg', 0.0) * params.get('specific_gravity_coarse_agg',
+                                                   SPECIFIC_GRAVITY_COARSE_AGG))
+    return admixture >= aggregate
+
+def optimize_mix(params, prices, dosages=ADMIXTURE_DOSAGES, sizes=AGGREGATE_SIZES,
+                 zones=FINE_AGG_ZONES, max_cement_content=MAX_CEMENT_CONTENT, top=10):
+    """Cheapest compliant designs for ``params``, ranked by cost per m³.
+
+    ``params`` is a ``mix_data`` dict without the choices being searched.
+    Missing exposure limits are taken from EXPOSURE_OPTIONS. ``prices``
+    maps 'cement', 'admixture', 'water', 'fine_agg' and 'coarse_agg' to a
+    price per kg. Cement and admixture prices may be dicts keyed by type;
+    only the priced types are searched. ``dosages`` is the allowed
+    admixture dosage in % of cement mass, either a sequence for all
+    admixtures or a dict keyed by type.
+
+    Returns a DataFrame of the ``top`` designs with their choices, design
+    outputs, cost per component and total ``cost``. ``frame.attrs['search']``
+    records how many combinations were pruned, designed and compliant.
+    """
+    params = dict(params)
+    for column, key in (('max_wc_ratio', 'max_wc'), ('min_cement_content', 'min_cement')):
+        # Explicit limits need no exposure class; an unknown one leaves the
+        # limit missing and every design fails on it
+        if column not in params:
+            limit = EXPOSURE_OPTIONS.get(params.get('exposure'), {}).get(key)
+            if limit is not None:
+                params[column] = limit
+
+    cement_prices = _price_table(prices['cement'], CEMENT_TYPES)
+    admixture_prices = _price_table(prices.get('admixture', {}), ADMIXTURE_TYPES)
+    if not isinstance(dosages, dict):
+        dosages = dict.fromkeys(admixture_prices, dosages)
+
+    admixtures = [(None, 0.0)]
+    for admix_type in _cheapest_per_class(admixture_prices, admixture_class):
+        allowed = sorted(dosages.get(admix_type) or ())
+        if allowed and _lowest_dosage_is_cheapest(admixture_prices[admix_type], params, prices):
+            allowed = allowed[:1]
+        admixtures.extend((admix_type, dosage) for dosage in allowed)
+    cements = _cheapest_per_class(cement_prices, cement_class)
+
+    combinations = len(cement_prices) * len(sizes) * len(zones) * (
+        1 + sum(len(dosages.get(admix_type) or ()) for admix_type in admixture_prices))
+    candidates = pd.DataFrame(
+        [{**params,
+          'cement_type': cement_type,
+          'use_admixture': admix_type is not None,
+          'admixture_type': admix_type or 'None',
+          'admixture_percentage': dosage,
+          'max_aggregate_size': size,
+          'fine_agg_zone': zone}
+         for cement_type, (admix_type, dosage), size, zone
+         in itertools.product(cements, admixtures, sizes, zones)])
+    designs = design_batch(candidates)
+
+    ranked = pd.concat([
+        candidates[['cement_type', 'admixture_type', 'admixture_percentage',
+                    'max_aggregate_size', 'fine_agg_zone']],
+        designs.drop(columns=['grade', 'exposure'])
+    ], axis=1)
+
+    unit_prices = {
+        'cement': ranked['cement_type'].map(cement_prices).to_numpy(dtype=float),
+        'admixture': ranked['admixture_type'].map(admixture_prices).fillna(0.0).to_numpy(dtype=float),
+        'water': prices.get('water', 0.0),
+        'fine_agg': prices.get('fine_agg', 0.0),
+        'coarse_agg': prices.get('coarse_agg', 0.0)
+    }
+    cost = np.zeros(len(ranked))
+    for component, column in COST_COMPONENTS.items():
+        ranked[f'cost_{component}'] = ranked[column].to_numpy() * unit_prices[component]
+        cost += ranked[f'cost_{component}'].to_numpy()
+    ranked['cost'] = cost
+
+    compliant = (ranked['success'].to_numpy(dtype=bool)
+                 & (ranked['cement_content'].to_numpy() <= max_cement_content)
+                 & (ranked['vol_all_aggregate'].to_numpy() > 0))
+    ranked = ranked[compliant].sort_values('cost', kind='stable').head(top).reset_index(drop=True)
+    ranked.attrs['search'] = {
+        'combinations': combinations,
+        'designed': len(candidates),
+        'compliant': int(compliant.sum())
+    }
+    return ranked
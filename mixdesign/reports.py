@@ -0,0 +1,368 @@
+"""Mix design submittal reports in bulk.
+
+Each design is rendered as an HTML page (printable from a browser, with
+print styles) and/or a fixed-width plain-text sheet. The templates are
+written in string.Template syntax and compiled once at import into
+str.format strings, so each report is a single format_map() call on
+fields formatted once per design.
+
+run() streams a CSV or Parquet file of mix requests through the design
+engine and the templates in chunks spread over a process pool, and writes
+each report as soon as its chunk is back, to a directory or a zip archive.
+Only the chunks in flight are held in memory. Zip entries are compressed
+by the writing process, so a directory is the faster target.
+
+    python -m mixdesign.reports requests.csv reports.zip --format html txt --workers 4
+"""
+
+import argparse
+import html
+import math
+import os
+import re
+import sys
+import time
+import zipfile
+from datetime import date
+from string import Template
+
+from .batch import BATCH_DEFAULTS
+from .cli import design_chunk, map_in_order, read_chunks
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Mix design $report_id - $grade</title>
+<style>
+body { font-family: Arial, Helvetica, sans-serif; color: #222; max-width: 46rem; margin: 2rem auto; }
+h1 { color: #1f77b4; font-size: 1.6rem; margin-bottom: 0; }
+h2 { font-size: 1.1rem; border-bottom: 2px solid #1f77b4; padding-bottom: 0.2rem; margin-top: 1.6rem; }
+table { width: 100%; border-collapse: collapse; }
+td { padding: 0.25rem 0.4rem; border-bottom: 1px solid #ddd; }
+td.value { text-align: right; }
+.meta { color: #555; }
+.note { font-size: 0.85rem; color: #555; margin-top: 1.6rem; }
+@media print {
+  body { margin: 0; max-width: none; font-size: 10pt; }
+  h1 { color: #000; }
+  h2 { border-color: #000; }
+}
+</style>
+</head>
+<body>
+<h1>Concrete Mix Design $grade</h1>
+<p class="meta">As per IS 10262:2019 &middot; Report $report_id &middot; Project $project &middot; Issued $issued</p>
+<h2>Design Parameters</h2>
+<table>
+<tr><td>Concrete grade</td><td class="value">$grade</td></tr>
+<tr><td>Exposure condition</td><td class="value">$exposure</td></tr>
+<tr><td>Maximum w/c ratio / minimum cement</td><td class="value">$max_wc_ratio / $min_cement_content kg/m³</td></tr>
+<tr><td>Cement type</td><td class="value">$cement_type</td></tr>
+<tr><td>Maximum aggregate size</td><td class="value">$max_aggregate_size mm</td></tr>
+<tr><td>Fine aggregate zone</td><td class="value">Zone $fine_agg_zone</td></tr>
+<tr><td>Workability (slump)</td><td class="value">$workability_slump mm</td></tr>
+<tr><td>Site control</td><td class="value">$site_control</td></tr>
+<tr><td>Chemical admixture</td><td class="value">$admixture</td></tr>
+<tr><td>Specific gravity: cement / coarse / fine</td><td class="value">$specific_gravity_cement / $specific_gravity_coarse_agg / $specific_gravity_fine_agg</td></tr>
+</table>
+<h2>Design Results</h2>
+<table>
+<tr><td>Target mean strength</td><td class="value">$target_strength N/mm²</td></tr>
+<tr><td>Water-cement ratio</td><td class="value">$wc_ratio</td></tr>
+<tr><td>Air content</td><td class="value">$air_content %</td></tr>
+<tr><td>Coarse / fine aggregate volume</td><td class="value">$vol_coarse % / $vol_fine %</td></tr>
+</table>
+<h2>Mix Proportions (per m³, SSD aggregates)</h2>
+<table>
+<tr><td>Cement</td><td class="value">$cement_content kg</td></tr>
+<tr><td>Water</td><td class="value">$water_content kg</td></tr>
+<tr><td>Chemical admixture</td><td class="value">$admixture_mass kg</td></tr>
+<tr><td>Fine aggregate</td><td class="value">$fine_agg_mass kg</td></tr>
+<tr><td>Coarse aggregate</td><td class="value">$coarse_agg_mass kg</td></tr>
+</table>
+<p class="note">Preliminary design for trial batches. Adjust for field moisture and verify
+workability and compressive strength with trial mixes and cube tests.</p>
+</body>
+</html>
+""")
+
+TEXT_TEMPLATE = Template("""CONCRETE MIX DESIGN $grade
+As per IS 10262:2019
+
+Report ............................ $report_id
+Project ........................... $project
+Issued ............................ $issued
+
+DESIGN PARAMETERS
+Concrete grade .................... $grade
+Exposure condition ................ $exposure
+Maximum w/c ratio ................. $max_wc_ratio
+Minimum cement content ............ $min_cement_content kg/m3
+Cement type ....................... $cement_type
+Maximum aggregate size ............ $max_aggregate_size mm
+Fine aggregate zone ............... Zone $fine_agg_zone
+Workability (slump) ............... $workability_slump mm
+Site control ...................... $site_control
+Chemical admixture ................ $admixture
+Specific gravity, cement .......... $specific_gravity_cement
+Specific gravity, coarse agg. ..... $specific_gravity_coarse_agg
+Specific gravity, fine agg. ....... $specific_gravity_fine_agg
+
+DESIGN RESULTS
+Target mean strength .............. $target_strength N/mm2
+Water-cement ratio ................ $wc_ratio
+Air content ....................... $air_content %
+Coarse aggregate volume ........... $vol_coarse %
+Fine aggregate volume ............. $vol_fine %
+
+MIX PROPORTIONS (per m3, SSD aggregates)
+Cement ............................ $cement_content kg
+Water ............................. $water_content kg
+Chemical admixture ................ $admixture_mass kg
+Fine aggregate .................... $fine_agg_mass kg
+Coarse aggregate .................. $coarse_agg_mass kg
+
+Preliminary design for trial batches. Adjust for field moisture and verify
+workability and compressive strength with trial mixes and cube tests.
+""")
+
+def compile_template(template):
+    """str.format equivalent of a string.Template."""
+    def convert(match):
+        named = match.group('named') or match.group('braced')
+        if named is not None:
+            return '{' + named + '}'
+        if match.group('escaped') is not None:
+            return template.delimiter
+        raise ValueError(f'Invalid placeholder in template at {match.start()}')
+    # Literal braces (CSS) must be doubled for str.format
+    return template.pattern.sub(convert, template.template.replace('{', '{{').replace('}', '}}'))
+
+REPORT_TEMPLATES = {
+    'html': compile_template(HTML_TEMPLATE),
+    'txt': compile_template(TEXT_TEMPLATE)
+}
+
+# Fields that may carry text needing HTML escaping; the rest are numbers
+TEXT_FIELDS = (
+    'grade', 'exposure', 'cement_type', 'fine_agg_zone', 'site_control', 'admixture',
+    'project', 'report_id'
+)
+
+# Deflate level of .zip output; reports are repetitive text, so the
+# fastest level already compresses them well
+ZIP_COMPRESSLEVEL = 1
+
+# Result fields and their format; fractions are shown in %
+RESULT_FORMATS = {
+    'target_strength': ('{:.2f}', 1),
+    'wc_ratio': ('{:.3f}', 1),
+    'water_content': ('{:.0f}', 1),
+    'cement_content': ('{:.0f}', 1),
+    'air_content': ('{:.1f}', 100),
+    'vol_coarse': ('{:.1f}', 100),
+    'vol_fine': ('{:.1f}', 100),
+    'admixture_mass': ('{:.2f}', 1),
+    'fine_agg_mass': ('{:.0f}', 1),
+    'coarse_agg_mass': ('{:.0f}', 1)
+}
+
+# Inputs shown as given; missing ones show the value design_batch() assumes
+INPUT_FIELDS = (
+    'grade', 'exposure', 'max_wc_ratio', 'min_cement_content', 'cement_type',
+    'max_aggregate_size', 'fine_agg_zone', 'workability_slump', 'site_control',
+    'specific_gravity_cement', 'specific_gravity_coarse_agg', 'specific_gravity_fine_agg'
+)
+
+def _missing(value):
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+def _input(params, key):
+    value = params.get(key)
+    return BATCH_DEFAULTS.get(key, '') if _missing(value) else value
+
+def _text(value):
+    # Whole floats from CSV columns read as 20 rather than 20.0
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def report_fields(params, results, report_id='', issued=None):
+    """Template fields of one report, as plain (unescaped) strings."""
+    fields = {key: _text(_input(params, key)) for key in INPUT_FIELDS}
+    if params.get('use_admixture') is True or params.get('use_admixture') == 1:
+        fields['admixture'] = (f"{_input(params, 'admixture_type')}, "
+                               f"{_text(_input(params, 'admixture_percentage'))}% of cement")
+    else:
+        fields['admixture'] = 'None'
+    for key, (spec, scale) in RESULT_FORMATS.items():
+        fields[key] = spec.format(results[key] * scale)
+    project = params.get('project')
+    fields['project'] = '-' if _missing(project) else str(project)
+    fields['report_id'] = str(report_id)
+    fields['issued'] = issued or date.today().isoformat()
+    return fields
+
+def render_reports(params, results, formats=('html',), report_id='', issued=None):
+    """One successful perform_full_design() result as 'html' and/or 'txt'
+    reports; returns a list of strings in the order of ``formats``."""
+    fields = report_fields(params, results, report_id, issued)
+    reports = []
+    for fmt in formats:
+        if fmt == 'html':
+            escaped = dict(fields)
+            for key in TEXT_FIELDS:
+                escaped[key] = html.escape(fields[key])
+            reports.append(REPORT_TEMPLATES[fmt].format_map(escaped))
+        else:
+            reports.append(REPORT_TEMPLATES[fmt].format_map(fields))
+    return reports
+
+def render_report(params, results, fmt='html', report_id='', issued=None):
+    """One successful perform_full_design() result as an 'html' or 'txt' report."""
+    return render_reports(params, results, (fmt,), report_id, issued)[0]
+
+_UNSAFE_NAME = re.compile(r'[^A-Za-z0-9._-]+')
+
+def report_name(report_id, fmt):
+    return f"{_UNSAFE_NAME.sub('_', str(report_id))}.{fmt}"
+
+def render_chunk(chunk, formats, issued, first_row):
+    """Design a chunk of requests and render its reports.
+
+    Returns ([(file name, encoded report, input row), ...], rows, failed).
+    Rows are named by their ``report_id`` column when there is one, else
+    by row number in the input; failed designs get no report.
+    """
+    designed = design_chunk(chunk)
+    names = list(designed.columns)
+    has_id = 'report_id' in designed.columns
+    files = []
+    failed = 0
+    for row, values in enumerate(zip(*(designed[name].tolist() for name in names)), first_row):
+        record = dict(zip(names, values))
+        if not record['success']:
+            failed += 1
+            continue
+        if has_id and not _missing(record['report_id']):
+            # A numeric id column with blanks reads as float: 17.0 is report 17
+            report_id = _text(record['report_id'])
+        else:
+            report_id = f'mix-{row:06d}'
+        for fmt, report in zip(formats, render_reports(record, record, formats, report_id, issued)):
+            files.append((report_name(report_id, fmt), report.encode(), row))
+    return files, len(designed), failed
+
+class ReportWriter:
+    """Writes reports into a directory, or into a zip archive for a .zip path.
+
+    Names are unique within a run: a name already written (a repeated
+    ``report_id``, or ids that sanitise to the same name) gets the input
+    row number appended instead of replacing the earlier report, and then
+    a counter if that name is taken too.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.bytes = 0
+        self._names = set()
+        if path.endswith('.zip'):
+            self._zip = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED,
+                                        compresslevel=ZIP_COMPRESSLEVEL)
+        else:
+            self._zip = None
+            os.makedirs(path, exist_ok=True)
+
+    def write(self, name, data, row=None):
+        """Write one report; returns the name it was written under."""
+        if name in self._names:
+            stem, ext = os.path.splitext(name)
+            if row is not None:
+                stem = f'{stem}-row{row:06d}'
+            # A name that is still taken (e.g. a report_id ending in -row
+            # and a number) gets a counter, so a run never stops halfway
+            renamed = f'{stem}{ext}'
+            suffix = 1
+            while renamed in self._names:
+                suffix += 1
+                renamed = f'{stem}-{suffix}{ext}'
+            name = renamed
+        self._names.add(name)
+        if self._zip is not None:
+            self._zip.writestr(name, data)
+        else:
+            with open(os.path.join(self.path, name), 'wb') as handle:
+                handle.write(data)
+        self.bytes += len(data)
+        return name
+
+    def close(self):
+        if self._zip is not None:
+            self._zip.close()
+
+def run(input_path, output_path, formats=('html',), chunk_size=2000, workers=None, progress=True,
+        issued=None):
+    """Render reports for every row of input_path into output_path; returns a stats dict."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    issued = issued or date.today().isoformat()
+    writer = ReportWriter(output_path)
+    rows = failed = reports = 0
+    start = time.perf_counter()
+
+    def collect(result):
+        nonlocal rows, failed, reports
+        files, chunk_rows, chunk_failed = result
+        for name, data, row in files:
+            writer.write(name, data, row)
+        rows += chunk_rows
+        failed += chunk_failed
+        reports += len(files)
+        if progress:
+            elapsed = time.perf_counter() - start
+            print(f"{rows} rows, {reports} reports, {reports / elapsed:,.0f} reports/s", file=sys.stderr)
+
+    def jobs():
+        first_row = 0
+        for chunk in read_chunks(input_path, chunk_size):
+            yield chunk, formats, issued, first_row
+            first_row += len(chunk)
+
+    try:
+        for result in map_in_order(render_chunk, jobs(), workers):
+            collect(result)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        'rows': rows,
+        'failed': failed,
+        'reports': reports,
+        'bytes': writer.bytes,
+        'seconds': elapsed,
+        'reports_per_second': reports / elapsed if elapsed > 0 else 0.0
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Mix design reports as per IS 10262:2019')
+    parser.add_argument('input', help='CSV or Parquet file of mix requests')
+    parser.add_argument('output', help='directory, or .zip archive, to write the reports to')
+    parser.add_argument('--format', nargs='+', choices=sorted(REPORT_TEMPLATES), default=['html'],
+                        help='report formats (default: html)')
+    parser.add_argument('--chunk-size', type=int, default=2000, help='rows per chunk (default: 2000)')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes; 1 runs in-process (default: CPU count)')
+    parser.add_argument('--quiet', action='store_true', help='only print the final summary')
+    args = parser.parse_args(argv)
+
+    stats = run(args.input, args.output, tuple(args.format), args.chunk_size, args.workers,
+                progress=not args.quiet)
+    print(f"Rendered {stats['reports']} reports for {stats['rows']} rows in {stats['seconds']:.2f} s "
+          f"({stats['reports_per_second']:,.0f} reports/s, {stats['bytes'] / 2**20:,.1f} MiB), "
+          f"{stats['failed']} failed")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""Sensitivity of a design to its inputs.
+
+Varies a set of factors (slump, aggregate type, admixture, fine aggregate
+zone, site control, specific gravities by default) around one design and
+pushes the variants through the vectorized design equations.
+
+- oat_sweeps() moves one factor at a time over its range or levels, the
+  others held at the design's values.
+- sobol_indices() estimates first-order and total-order variance-based
+  (Sobol) indices with the Saltelli scheme: two quasi-random sample
+  matrices A and B from a scrambled Halton sequence, and for each factor
+  the matrix A with that factor's column taken from B. First-order
+  indices use the Saltelli (2010) estimator, total-order ones Jansen's.
+
+Continuous factors are sampled uniformly over their (low, high) range,
+the others uniformly over their levels. Halton points are addressed by
+index, so each chunk of the sample generates its own points; chunks can
+be spread over processes and only return running sums, so memory stays
+flat however many samples are drawn.
+"""
+
+import itertools
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .core import (
+    ADMIXTURE_TYPES, FINE_AGG_ZONES, SITE_CONTROLS, SIZE_OTHER, SLUMP_RANGE, ZONE_OTHER,
+    ConcreteMixDesign
+)
+from .vectorized import design_arrays
+
+# Continuous factors and the design_arrays() input each one sets
+CONTINUOUS_COLUMNS = {
+    'workability_slump': 'slump',
+    'specific_gravity_cement': 'sg_cement',
+    'specific_gravity_coarse_agg': 'sg_coarse',
+    'specific_gravity_fine_agg': 'sg_fine'
+}
+
+NO_ADMIXTURE = 'None'
+
+# (low, high) for continuous factors, levels for the others. Any other
+# mix_data key can be varied over levels, e.g. 'max_aggregate_size'.
+DEFAULT_FACTORS = {
+    'workability_slump': SLUMP_RANGE,
+    'aggregate_type': (
+        'Crushed angular aggregate', 'Sub-angular aggregate',
+        'Gravel with some crushed particles', 'Rounded gravel'
+    ),
+    'admixture_type': (NO_ADMIXTURE,) + tuple(ADMIXTURE_TYPES),
+    'fine_agg_zone': FINE_AGG_ZONES,
+    'site_control': tuple(SITE_CONTROLS),
+    'specific_gravity_cement': (3.10, 3.20),
+    'specific_gravity_coarse_agg': (2.60, 2.90),
+    'specific_gravity_fine_agg': (2.55, 2.75)
+}
+
+# Reported outputs and the design_arrays() key of each
+OUTPUTS = {
+    'cement_content': 'cement_content',
+    'wc_ratio': 'wc_ratio',
+    'effective_wc_ratio': 'wc_ratio_adjusted',
+    'water_content': 'water_content',
+    'fine_agg_mass': 'fine_agg_mass',
+    'coarse_agg_mass': 'coarse_agg_mass'
+}
+
+HALTON_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41, 43, 47, 53, 59, 61, 67, 71,
+                 73, 79, 83, 89, 97, 101, 103, 107, 109, 113)
+
+# Leading Halton points dropped (the first is all zeros)
+HALTON_SKIP = 1
+
+def halton(start, stop, dims, seed=0):
+    """Points start..stop-1 of the ``dims``-dimensional Halton sequence.
+
+    With a ``seed`` the digits of each base are scrambled by a fixed random
+    permutation (0 kept), which breaks up the correlation between the
+    higher bases; ``seed=None`` gives the plain sequence.
+    """
+    if dims > len(HALTON_PRIMES):
+        raise ValueError(f'At most {len(HALTON_PRIMES)} dimensions are supported')
+    rng = None if seed is None else np.random.default_rng(seed)
+    index = np.arange(start, stop, dtype=np.int64)
+    points = np.zeros((len(index), dims))
+    for dim, base in enumerate(HALTON_PRIMES[:dims]):
+        digits = np.arange(base)
+        if rng is not None:
+            digits[1:] = rng.permutation(digits[1:])
+        remaining = index.copy()
+        scale = 1.0 / base
+        while remaining.any():
+            points[:, dim] += scale * digits[remaining % base]
+            remaining //= base
+            scale /= base
+    return points
+
+def _variant(params, levels):
+    params = dict(params)
+    for name, level in levels.items():
+        if name == 'admixture_type':
+            if level == NO_ADMIXTURE:
+                params['use_admixture'] = False
+            else:
+                params.update(use_admixture=True, admixture_type=level)
+        else:
+            params[name] = level
+    return params
+
+def _columns(mix):
+    # design_arrays() inputs of a parsed design; design_std_dev() already
+    # applies site control, so fair_control stays off
+    return {
+        'f_ck': mix.f_ck, 'std_dev': mix.design_std_dev(), 'X': mix.X,
+        'cement_code': mix.cement_code, 'max_wc_ratio': mix.max_wc_ratio,
+        'size_code': mix.size_code, 'slump': mix.workability_slump, 'agg_code': mix.agg_code,
+        'admix_code': mix.admix_code, 'min_cement_content': mix.min_cement_content,
+        'zone_code': mix.zone_code, 'pumped': mix.pumped, 'sg_cement': mix.sg_cement,
+        'sg_coarse': mix.sg_coarse, 'sg_fine': mix.sg_fine,
+        'admixture_percentage': mix.admixture_percentage, 'sg_admixture': mix.sg_admixture
+    }
+
+def _parse(params):
+    # A fresh designer per variant: set_input_parameters() merges into mix_data
+    designer = ConcreteMixDesign()
+    designer.set_input_parameters(params)
+    results = designer.perform_full_design()
+    if not results['success']:
+        raise ValueError(f"Design failed: {results['error']}")
+    return designer.parsed_input()
+
+def _overlapping(tables):
+    # Factors grouped so that no two groups override the same input
+    groups = []
+    for name, table in tables.items():
+        merged = [name]
+        columns = set(table)
+        for group in [group for group in groups if group[1] & columns]:
+            groups.remove(group)
+            merged = group[0] + merged
+            columns |= group[1]
+        groups.append((merged, columns))
+    return [names for names, _ in groups]
+
+class _Setup:
+    """The design's inputs, and the inputs each factor level sets.
+
+    Factors that set the same input (e.g. grade and site_control both set
+    the standard deviation) only act together, so such a group is also
+    designed from every combination of its levels.
+    """
+
+    def __init__(self, params, factors):
+        self.base = _columns(_parse(params))
+        self.names = list(factors)
+        self.ranges = {}
+        self.counts = {}
+        self.levels = {}
+        for name, values in factors.items():
+            if name in CONTINUOUS_COLUMNS:
+                low, high = values
+                self.ranges[name] = (float(low), float(high))
+                continue
+            self.levels[name] = self._table(params, [{name: level} for level in values])
+            self.counts[name] = len(values)
+        for name in self.ranges:
+            column = CONTINUOUS_COLUMNS[name]
+            for other, table in self.levels.items():
+                if column in table:
+                    raise ValueError(f'{name} and {other} both set {column}')
+        # Mixed-radix order, the last factor varying fastest
+        self.groups = [
+            (names, self._table(params, [dict(zip(names, combination)) for combination
+                                         in itertools.product(*(factors[name] for name in names))]))
+            for names in _overlapping(self.levels) if len(names) > 1
+        ]
+        self.nominal = {output: float(values[0]) for output, values in self.design(1, {}).items()}
+
+    def _table(self, params, variants):
+        # Only the inputs that differ from the design's are overridden
+        designs = []
+        for levels in variants:
+            mix = _parse(_variant(params, levels))
+            if mix.size_code == SIZE_OTHER or mix.zone_code == ZONE_OTHER:
+                raise ValueError(f'Unsupported levels {levels!r}')
+            designs.append(_columns(mix))
+        return {
+            column: np.array([design[column] for design in designs])
+            for column in self.base
+            if any(design[column] != self.base[column] for design in designs)
+        }
+
+    def design(self, n, assignments):
+        """Design n variants; ``assignments`` maps a factor to its values
+        (continuous) or level indices, one per variant. Factors of a group
+        are varied one at a time or all together."""
+        columns = {column: np.full(n, value) for column, value in self.base.items()}
+        joint = set()
+        for names, table in self.groups:
+            varied = [name for name in names if name in assignments]
+            if len(varied) < 2:
+                continue
+            if len(varied) < len(names):
+                raise ValueError(f"Vary {', '.join(names)} one at a time or all together")
+            index = 0
+            for name in names:
+                index = index * self.counts[name] + assignments[name]
+            for column, values in table.items():
+                columns[column] = values[index]
+            joint.update(names)
+        for name, values in assignments.items():
+            if name in joint:
+                continue
+            if name in CONTINUOUS_COLUMNS:
+                columns[CONTINUOUS_COLUMNS[name]] = values
+            else:
+                for column, table in self.levels[name].items():
+                    columns[column] = table[values]
+        design = design_arrays(fair_control=np.zeros(n, dtype=bool), **columns)
+        return {output: design[key] for output, key in OUTPUTS.items()}
+
+    def from_unit(self, points):
+        """Factor assignments for points of the unit cube, one column per factor."""
+        assignments = {}
+        for column, name in enumerate(self.names):
+            u = points[:, column]
+            if name in self.ranges:
+                low, high = self.ranges[name]
+                assignments[name] = low + u * (high - low)
+            else:
+                count = self.counts[name]
+                assignments[name] = np.minimum((u * count).astype(int), count - 1)
+        return assignments
+
+def oat_sweeps(params, factors=DEFAULT_FACTORS, points=11):
+    """One-at-a-time sweeps around the design for ``params``.
+
+    Each continuous factor takes ``points`` evenly spaced values over its
+    range, every other factor each of its levels, with the remaining
+    inputs as given in ``params``. Returns a DataFrame with ``factor``,
+    ``value`` and one column per OUTPUTS entry.
+    """
+    setup = _Setup(params, factors)
+    frames = []
+    for name, values in factors.items():
+        if name in CONTINUOUS_COLUMNS:
+            values = np.linspace(*setup.ranges[name], points)
+            outputs = setup.design(len(values), {name: values})
+            values = values.tolist()
+        else:
+            values = list(values)
+            outputs = setup.design(len(values), {name: np.arange(len(values))})
+        frames.append(pd.DataFrame({'factor': name, 'value': values, **outputs}))
+    return pd.concat(frames, ignore_index=True)
+
+def _sobol_chunk(params, factors, start, stop, seed):
+    setup = _Setup(params, factors)
+    d = len(setup.names)
+    n = stop - start
+    points = halton(start + HALTON_SKIP, stop + HALTON_SKIP, 2 * d, seed)
+    a, b = points[:, :d], points[:, d:]
+    # A, B and every A_B(i) designed in one call
+    stacked = np.empty(((d + 2) * n, d))
+    stacked[:n] = a
+    stacked[n:2 * n] = b
+    for i in range(d):
+        block = stacked[(i + 2) * n:(i + 3) * n]
+        block[:] = a
+        block[:, i] = b[:, i]
+    outputs = setup.design(len(stacked), setup.from_unit(stacked))
+
+    sums = {}
+    for output, values in outputs.items():
+        # Centred on the nominal design, which keeps the sums well conditioned
+        values = (values - setup.nominal[output]).reshape(d + 2, n)
+        f_a, f_b, f_ab = values[0], values[1], values[2:]
+        sums[output] = np.concatenate([
+            [f_a.sum(), f_b.sum(), np.square(f_a).sum(), np.square(f_b).sum()],
+            (f_b * (f_ab - f_a)).sum(axis=1),
+            np.square(f_a - f_ab).sum(axis=1)
+        ])
+    return n, setup.nominal, sums
+
+def sobol_indices(params, factors=DEFAULT_FACTORS, samples=2**14, chunk_size=4096, workers=1,
+                  seed=0):
+    """First- and total-order Sobol indices of each factor for each output.
+
+    ``samples`` base points give ``samples * (len(factors) + 2)`` designs,
+    evaluated ``chunk_size`` base points at a time over ``workers``
+    processes. Returns a DataFrame with ``factor``, ``output``,
+    ``first_order`` and ``total_order``; indices of an output that does not
+    vary are 0. Estimates near 0 can come out slightly negative.
+    ``frame.attrs`` records the mean and standard deviation of each output,
+    the number of designs and the time taken.
+    """
+    start_time = time.perf_counter()
+    names = list(factors)
+    d = len(names)
+    bounds = [(start, min(start + chunk_size, samples)) for start in range(0, samples, chunk_size)]
+    jobs = [(params, factors, start, stop, seed) for start, stop in bounds]
+
+    count = 0
+    nominal = None
+    totals = {}
+
+    def collect(result):
+        nonlocal count, nominal
+        n, nominal, sums = result
+        count += n
+        for output, values in sums.items():
+            totals[output] = totals.get(output, 0) + values
+
+    if workers <= 1:
+        for job in jobs:
+            collect(_sobol_chunk(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(_sobol_chunk, *zip(*jobs)):
+                collect(result)
+
+    rows = []
+    moments = {}
+    for output, values in totals.items():
+        sum_a, sum_b, squares_a, squares_b = values[:4]
+        mean = (sum_a + sum_b) / (2 * count)
+        variance = max((squares_a + squares_b) / (2 * count) - mean * mean, 0.0)
+        first = values[4:4 + d] / count
+        total = values[4 + d:] / (2 * count)
+        for i, name in enumerate(names):
+            rows.append({
+                'factor': name,
+                'output': output,
+                'first_order': float(first[i] / variance) if variance > 0 else 0.0,
+                'total_order': float(total[i] / variance) if variance > 0 else 0.0
+            })
+        moments[output] = {'mean': float(nominal[output] + mean), 'std': math.sqrt(variance)}
+
+    frame = pd.DataFrame(rows)
+    frame.attrs['samples'] = count
+    frame.attrs['designs'] = count * (d + 2)
+    frame.attrs['outputs'] = moments
+    frame.attrs['seconds'] = time.perf_counter() - start_time
+    return frame
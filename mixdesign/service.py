@@ -0,0 +1,287 @@
+"""Asynchronous JSON design service for plant controllers and ERP systems.
+
+A small HTTP/1.1 server on asyncio (standard library only, plus NumPy for
+the vectorized path) with persistent connections:
+
+- ``POST /design`` takes one ``mix_data`` object, or a list of them, and
+  returns the perform_full_design() result(s) as JSON.
+- ``GET /health`` reports liveness and queue depth.
+- ``GET /metrics`` returns METRICS in the Prometheus text format.
+
+Concurrent requests for the same design (same design_key) share one
+computation. Distinct requests queued while a batch is running are
+designed together: small batches through the scalar engine, larger ones
+through the vectorized equations, with identical results.
+
+    python -m mixdesign.service --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+
+from .core import (
+    GRADE_PROPERTIES, INTEGER_RESULT_KEYS, RESULT_KEYS, SIZE_OTHER, ZONE_OTHER, ConcreteMixDesign,
+    MixInput
+)
+from .metrics import METRICS
+from .vectorized import design_mix_inputs
+
+# Below this many queued designs the scalar engine is faster
+VECTOR_BATCH_MIN = 32
+MAX_BATCH = 4096
+MAX_BODY = 16 * 2**20
+
+# MixInput fields that must be plain positive numbers for the vectorized path
+POSITIVE_INPUTS = (
+    'max_wc_ratio', 'workability_slump', 'min_cement_content', 'sg_cement', 'sg_coarse',
+    'sg_fine', 'sg_admixture'
+)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large'}
+
+def _encode(value):
+    return json.dumps(value).encode()
+
+def _vectorizable(mix, params):
+    # Anything the scalar engine would reject (or divide by zero on) is left
+    # to it, so error messages match
+    if mix.size_code == SIZE_OTHER or mix.zone_code == ZONE_OTHER or 'exposure' not in params:
+        return False
+    for name in POSITIVE_INPUTS + ('admixture_percentage', 'estimated_std_dev'):
+        value = getattr(mix, name)
+        if value is None and name == 'estimated_std_dev':
+            continue
+        if type(value) not in (int, float) or not math.isfinite(value):
+            return False
+        if value <= 0 and name in POSITIVE_INPUTS:
+            return False
+    return True
+
+class DesignService:
+    """Request coalescing and micro-batching in front of the design engine."""
+
+    def __init__(self, max_batch=MAX_BATCH, batch_delay=0.0, vector_min=VECTOR_BATCH_MIN):
+        self.max_batch = max_batch
+        self.batch_delay = batch_delay
+        self.vector_min = vector_min
+        self.grade_properties = GRADE_PROPERTIES
+        self.started = time.time()
+        self._inflight = {}
+        self._queue = deque()
+        self._wakeup = None
+        self._batcher = None
+
+    def start(self):
+        self._wakeup = asyncio.Event()
+        self._batcher = asyncio.get_running_loop().create_task(self._run_batches())
+
+    async def design(self, params):
+        """JSON-encoded result for one ``mix_data`` dict."""
+        METRICS.increment('service_designs')
+        try:
+            mix = MixInput.from_mix_data(params, self.grade_properties)
+            key = mix.key()
+            future = self._inflight.get(key)
+        except Exception:
+            # Inputs the engine rejects get its own error message
+            return _encode(self._scalar(params))
+
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight[key] = future
+            self._queue.append((key, mix, params, future))
+            self._wakeup.set()
+        else:
+            METRICS.increment('service_coalesced')
+        # Shielded so one client disconnecting does not cancel the others
+        return await asyncio.shield(future)
+
+    def _scalar(self, params):
+        designer = ConcreteMixDesign()
+        designer.set_input_parameters(params)
+        return designer.perform_full_design()
+
+    def _scalar_body(self, params):
+        try:
+            return _encode(self._scalar(params))
+        except Exception as e:
+            return _encode({'success': False, 'error': str(e), 'error_type': type(e).__name__})
+
+    async def _run_batches(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            if self.batch_delay:
+                await asyncio.sleep(self.batch_delay)
+            while self._queue:
+                batch = [self._queue.popleft()
+                         for _ in range(min(self.max_batch, len(self._queue)))]
+                try:
+                    bodies = self._design_batch(batch)
+                except Exception:
+                    bodies = [self._scalar_body(params) for _, _, params, _ in batch]
+                for (key, _, _, future), body in zip(batch, bodies):
+                    del self._inflight[key]
+                    if not future.done():
+                        future.set_result(body)
+                # Let connections read and queue more work between batches
+                await asyncio.sleep(0)
+
+    def _design_batch(self, batch):
+        start = time.perf_counter()
+        METRICS.increment('service_batches')
+        bodies = [None] * len(batch)
+        vector_rows = [i for i, (_, mix, params, _) in enumerate(batch) if _vectorizable(mix, params)]
+        if len(vector_rows) < self.vector_min:
+            vector_rows = []
+
+        if vector_rows:
+            try:
+                arrays = design_mix_inputs([batch[i][1] for i in vector_rows])
+            except Exception:
+                # Something _vectorizable() let through; design each row on its
+                # own so only the bad request gets an error
+                METRICS.increment('service_vector_fallbacks')
+                vector_rows = []
+        if vector_rows:
+            columns = {key: arrays[key].tolist() for key in RESULT_KEYS}
+            for key in INTEGER_RESULT_KEYS:
+                columns[key] = [int(value) for value in columns[key]]
+            for row, i in enumerate(vector_rows):
+                params = batch[i][2]
+                results = {'success': True}
+                for key in RESULT_KEYS:
+                    results[key] = columns[key][row]
+                results['grade'] = params['grade']
+                results['exposure'] = params['exposure']
+                bodies[i] = _encode(results)
+            METRICS.increment('service_vector_rows', len(vector_rows))
+
+        scalar_rows = 0
+        for i, (_, _, params, _) in enumerate(batch):
+            if bodies[i] is None:
+                bodies[i] = self._scalar_body(params)
+                scalar_rows += 1
+        METRICS.increment('service_scalar_rows', scalar_rows)
+        METRICS.record('service_batch', time.perf_counter() - start)
+        return bodies
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'uptime_seconds': time.time() - self.started,
+            'in_flight': len(self._inflight),
+            'queued': len(self._queue)
+        }
+
+    async def route(self, method, path, body):
+        """(status, content type, payload bytes) for one request."""
+        path = path.split('?', 1)[0]
+        if path == '/design':
+            if method != 'POST':
+                return 405, 'application/json', _encode({'error': 'Use POST'})
+            try:
+                request = json.loads(body)
+            except ValueError as e:
+                return 400, 'application/json', _encode({'error': f'Invalid JSON: {e}'})
+            if isinstance(request, dict):
+                return 200, 'application/json', await self.design(request)
+            if isinstance(request, list) and all(isinstance(item, dict) for item in request):
+                results = await asyncio.gather(*(self.design(item) for item in request))
+                return 200, 'application/json', b'[' + b','.join(results) + b']'
+            return 400, 'application/json', _encode({'error': 'Expected an object or a list of objects'})
+        if method != 'GET':
+            return 405, 'application/json', _encode({'error': 'Use GET'})
+        if path == '/health':
+            return 200, 'application/json', _encode(self.health())
+        if path == '/metrics':
+            return 200, 'text/plain; version=0.0.4', METRICS.to_prometheus().encode()
+        return 404, 'application/json', _encode({'error': f'Not found: {path}'})
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                start = time.perf_counter()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError(f'Negative Content-Length: {length}')
+                except ValueError:
+                    await self._respond(writer, 400, 'application/json',
+                                        _encode({'error': 'Malformed request'}), False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, 'application/json',
+                                        _encode({'error': 'Request body too large'}), False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                connection = headers.get('connection', '').lower()
+                keep_alive = connection == 'keep-alive' or (version == 'HTTP/1.1' and connection != 'close')
+                status, content_type, payload = await self.route(method, path, body)
+                await self._respond(writer, status, content_type, payload, keep_alive)
+                METRICS.record('service_request', time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, payload, keep_alive):
+        head = (
+            f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(payload)}\r\n'
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode('latin-1') + payload)
+        await writer.drain()
+
+async def serve(host='127.0.0.1', port=8000, **options):
+    """Run the service until cancelled."""
+    METRICS.enable()
+    service = DesignService(**options)
+    service.start()
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    bound = server.sockets[0].getsockname()
+    print(f'Serving on http://{bound[0]}:{bound[1]}', flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000, help='0 picks a free port')
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--batch-delay-ms', type=float, default=0.0,
+                        help='wait this long to collect a batch (default: batch what is queued)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, max_batch=args.max_batch,
+                          batch_delay=args.batch_delay_ms / 1000))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
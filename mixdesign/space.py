@@ -0,0 +1,142 @@
+"""Precomputed design space with indexed reverse queries."""
+
+import numpy as np
+import pandas as pd
+
+from .batch import design_batch
+from .core import (
+    ADMIXTURE_TYPES, AGGREGATE_SIZES, CEMENT_TYPES, EXPOSURE_OPTIONS, FINE_AGG_ZONES,
+    GRADE_PROPERTIES, SITE_CONTROLS, SLUMP_RANGE
+)
+
+DESIGN_SPACE_INDEXES = (
+    'cement_content', 'wc_ratio', 'water_content', 'target_strength',
+    'f_ck', 'exposure', 'max_aggregate_size'
+)
+
+def _expand_codes(sizes):
+    # Row-major codes for the cartesian product of dimensions of these sizes
+    total = int(np.prod(sizes))
+    codes = []
+    inner = total
+    for size in sizes:
+        inner //= size
+        codes.append(np.tile(np.repeat(np.arange(size, dtype=np.int16), inner), total // (inner * size)))
+    return codes
+
+def enumerate_design_space(slump_step=5):
+    """Inputs for every combination of the app's discrete input domains."""
+    grade_properties = GRADE_PROPERTIES
+    grades = list(grade_properties)
+    exposures = list(EXPOSURE_OPTIONS)
+    slumps = np.arange(SLUMP_RANGE[0], SLUMP_RANGE[1] + 1, slump_step)
+    admixtures = ['None'] + ADMIXTURE_TYPES
+    dims = (grades, exposures, CEMENT_TYPES, AGGREGATE_SIZES, FINE_AGG_ZONES,
+            slumps, admixtures, SITE_CONTROLS)
+    (grade_code, exposure_code, cement_code, size_code, zone_code,
+     slump_code, admix_code, control_code) = _expand_codes([len(dim) for dim in dims])
+
+    max_wc = np.array([EXPOSURE_OPTIONS[e]['max_wc'] for e in exposures])
+    min_cement = np.array([EXPOSURE_OPTIONS[e]['min_cement'] for e in exposures], dtype=float)
+    f_ck = np.array([grade_properties[g]['f_ck'] for g in grades])
+    return pd.DataFrame({
+        'grade': pd.Categorical.from_codes(grade_code, grades),
+        'f_ck': f_ck[grade_code],
+        'exposure': pd.Categorical.from_codes(exposure_code, exposures),
+        'cement_type': pd.Categorical.from_codes(cement_code, CEMENT_TYPES),
+        'max_aggregate_size': np.array(AGGREGATE_SIZES)[size_code],
+        'fine_agg_zone': pd.Categorical.from_codes(zone_code, FINE_AGG_ZONES),
+        'workability_slump': slumps[slump_code],
+        'use_admixture': admix_code > 0,
+        'admixture_type': pd.Categorical.from_codes(admix_code, admixtures),
+        'site_control': pd.Categorical.from_codes(control_code, SITE_CONTROLS),
+        'max_wc_ratio': max_wc[exposure_code],
+        'min_cement_content': min_cement[exposure_code]
+    })
+
+class DesignSpace:
+    """Columnar table of precomputed designs with sorted indexes.
+
+    Answers reverse queries such as "Severe exposure, f_ck >= 30, 20 mm,
+    cement_content <= 380" with binary searches instead of a scan. A query
+    condition is either a value (equality) or a ``(low, high)`` tuple of
+    inclusive bounds, where either bound may be None.
+    """
+
+    def __init__(self, table, index_columns=DESIGN_SPACE_INDEXES):
+        self.table = table
+        self._values = {}
+        self._indexes = {}
+        for column in index_columns:
+            self.index(column)
+
+    @classmethod
+    def build(cls, slump_step=5, index_columns=DESIGN_SPACE_INDEXES):
+        inputs = enumerate_design_space(slump_step)
+        results = design_batch(inputs)
+        outputs = results.drop(columns=['success', 'error', 'grade', 'exposure'])
+        return cls(pd.concat([inputs, outputs], axis=1), index_columns)
+
+    def __len__(self):
+        return len(self.table)
+
+    def values(self, column):
+        if column not in self._values:
+            series = self.table[column]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                self._values[column] = series.cat.codes.to_numpy()
+            else:
+                self._values[column] = series.to_numpy()
+        return self._values[column]
+
+    def index(self, column):
+        if column not in self._indexes:
+            values = self.values(column)
+            order = np.argsort(values, kind='stable')
+            self._indexes[column] = (order, values[order])
+        return self._indexes[column]
+
+    def _bounds(self, column, condition):
+        series = self.table[column]
+        if isinstance(condition, tuple):
+            low, high = condition
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                raise ValueError(f"Range conditions are not supported on '{column}'")
+            return low, high
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            categories = series.cat.categories
+            if condition not in categories:
+                return None
+            condition = categories.get_loc(condition)
+        return condition, condition
+
+    def query(self, **conditions):
+        """Rows of the table matching every condition, in table order."""
+        ranges = []
+        for column, condition in conditions.items():
+            bounds = self._bounds(column, condition)
+            if bounds is None:
+                return self.table.iloc[:0]
+            order, sorted_values = self.index(column)
+            low, high = bounds
+            start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+            stop = len(order) if high is None else np.searchsorted(sorted_values, high, side='right')
+            ranges.append((stop - start, column, bounds, order, start, stop))
+
+        if not ranges:
+            return self.table
+
+        # Take candidates from the most selective index, then filter those
+        # rows against the remaining conditions
+        ranges.sort(key=lambda item: item[0])
+        _, _, _, order, start, stop = ranges[0]
+        rows = order[start:stop]
+        for _, column, (low, high), _, _, _ in ranges[1:]:
+            values = self.values(column)[rows]
+            keep = np.ones(len(rows), dtype=bool)
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+            rows = rows[keep]
+        return self.table.iloc[np.sort(rows)]
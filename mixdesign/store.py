@@ -0,0 +1,201 @@
+"""Persistent history of computed designs in SQLite.
+
+Every stored design keeps its inputs and results as JSON, together with a
+canonical input hash (the SHA-256 of its design_key, so equivalent inputs
+share a hash), project, grade, exposure, creation time and an approval
+flag. B-tree indexes on the hash, grade/exposure, grade, creation time
+and project, and partial indexes over approved designs, keep lookups
+logarithmic in the number of stored designs and return them already in
+date order. Bulk
+inserts from batch runs go through executemany() in one transaction.
+
+Row ids never change, so a pour record can cite the exact design it used.
+"""
+
+import hashlib
+import json
+import math
+import sqlite3
+import threading
+from datetime import datetime
+
+from .core import GRADE_PROPERTIES, INTEGER_RESULT_KEYS, RESULT_KEYS, design_key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS designs (
+    id INTEGER PRIMARY KEY,
+    input_hash TEXT NOT NULL,
+    project TEXT,
+    grade TEXT,
+    exposure TEXT,
+    created_at TEXT NOT NULL,
+    approved INTEGER NOT NULL DEFAULT 0,
+    inputs TEXT NOT NULL,
+    results TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS designs_input_hash ON designs (input_hash, project);
+CREATE INDEX IF NOT EXISTS designs_grade_exposure ON designs (grade, exposure, created_at);
+CREATE INDEX IF NOT EXISTS designs_grade ON designs (grade, created_at);
+CREATE INDEX IF NOT EXISTS designs_created_at ON designs (created_at);
+CREATE INDEX IF NOT EXISTS designs_approved ON designs (created_at) WHERE approved = 1;
+CREATE INDEX IF NOT EXISTS designs_approved_grade ON designs (grade, created_at) WHERE approved = 1;
+CREATE INDEX IF NOT EXISTS designs_project ON designs (project, created_at);
+"""
+
+COLUMNS = ('id', 'input_hash', 'project', 'grade', 'exposure', 'created_at', 'approved',
+           'inputs', 'results')
+
+def _canonical(value):
+    # Numerically equal inputs must hash equal, as they compare equal in
+    # design_key(): 20 and 20.0 (CSV and Parquet columns give floats) and
+    # NumPy scalars from batch frames
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def design_hash(params, grade_properties=None):
+    """Canonical hash of a set of design inputs."""
+    key = [_canonical(value) for value in design_key(params, grade_properties)]
+    return hashlib.sha256(_encode(key).encode()).hexdigest()
+
+def _json_default(value):
+    # NumPy scalars from batch frames
+    return value.item()
+
+_encode = json.JSONEncoder(default=_json_default).encode
+_encode_sorted = json.JSONEncoder(default=_json_default, sort_keys=True).encode
+
+class DesignStore:
+    """SQLite store of design inputs and results, safe to share between threads."""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._grade_properties = GRADE_PROPERTIES
+        with self._lock, self._connection:
+            if path != ':memory:':
+                self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute('PRAGMA synchronous=NORMAL')
+            self._connection.executescript(SCHEMA)
+
+    def _row(self, params, results, project, approved, created_at):
+        return (
+            design_hash(params, self._grade_properties),
+            project,
+            params.get('grade'),
+            params.get('exposure'),
+            created_at,
+            int(approved),
+            _encode_sorted(params),
+            _encode(results)
+        )
+
+    def save(self, params, results, project=None, approved=False):
+        """Store one design; returns its id."""
+        row = self._row(params, results, project, approved, datetime.now().isoformat())
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                'INSERT INTO designs (input_hash, project, grade, exposure, created_at, approved, '
+                'inputs, results) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', row)
+        return cursor.lastrowid
+
+    def save_batch(self, inputs, results, project=None, approved=False):
+        """Store the successful rows of a design_batch() run in one
+        transaction; returns the number of designs stored."""
+        created_at = datetime.now().isoformat()
+        # Missing values in the input frame mean "not given", as in design_batch()
+        names = list(inputs.columns)
+        input_records = [
+            {key: value for key, value in zip(names, values)
+             if not (isinstance(value, float) and math.isnan(value))}
+            for values in zip(*(inputs[name].tolist() for name in names))
+        ]
+        # Same shape as perform_full_design() results
+        columns = {key: results[key].tolist() for key in RESULT_KEYS + ('grade', 'exposure')}
+        for key in INTEGER_RESULT_KEYS:
+            columns[key] = [value if math.isnan(value) else int(value) for value in columns[key]]
+        keys = ('success',) + RESULT_KEYS + ('grade', 'exposure')
+        rows = [
+            self._row(params, dict(zip(keys, (True,) + outputs)), project, approved, created_at)
+            for params, outputs, success in zip(input_records, zip(*columns.values()),
+                                                results['success'].tolist())
+            if success
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                'INSERT INTO designs (input_hash, project, grade, exposure, created_at, approved, '
+                'inputs, results) VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+        return len(rows)
+
+    def _query(self, sql, args=()):
+        with self._lock:
+            rows = self._connection.execute(sql, args).fetchall()
+        return [self._record(row) for row in rows]
+
+    def _record(self, row):
+        record = dict(zip(COLUMNS, row))
+        record['approved'] = bool(record['approved'])
+        record['inputs'] = json.loads(record['inputs'])
+        record['results'] = json.loads(record['results'])
+        return record
+
+    def get(self, design_id):
+        records = self._query('SELECT * FROM designs WHERE id = ?', (design_id,))
+        return records[0] if records else None
+
+    def find(self, params, project=None, approved_only=False):
+        """Latest stored design with the same inputs, or None."""
+        sql = 'SELECT * FROM designs WHERE input_hash = ? AND project IS ?'
+        if approved_only:
+            sql += ' AND approved = 1'
+        sql += ' ORDER BY id DESC LIMIT 1'
+        records = self._query(sql, (design_hash(params, self._grade_properties), project))
+        return records[0] if records else None
+
+    def approve(self, design_id, approved=True):
+        with self._lock, self._connection:
+            self._connection.execute('UPDATE designs SET approved = ? WHERE id = ?',
+                                     (int(approved), design_id))
+
+    def history(self, grade=None, exposure=None, project=None, since=None, until=None,
+                approved_only=False, limit=100):
+        """Stored designs, newest first, filtered on the indexed columns.
+
+        ``since`` and ``until`` are dates, datetimes or ISO strings.
+        """
+        conditions = []
+        args = []
+        for column, value in (('grade', grade), ('exposure', exposure), ('project', project)):
+            if value is not None:
+                conditions.append(f'{column} = ?')
+                args.append(value)
+        if since is not None:
+            conditions.append('created_at >= ?')
+            args.append(since if isinstance(since, str) else since.isoformat())
+        if until is not None:
+            conditions.append('created_at < ?')
+            args.append(until if isinstance(until, str) else until.isoformat())
+        if approved_only:
+            conditions.append('approved = 1')
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+        return self._query(f'SELECT * FROM designs{where} ORDER BY created_at DESC, id DESC LIMIT ?',
+                           (*args, limit))
+
+    def projects(self):
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT DISTINCT project FROM designs WHERE project IS NOT NULL ORDER BY project'
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM designs').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,181 @@
+"""Standard deviation of strength estimated from streamed cube test results.
+
+Results are kept in an append-only CSV log (plant, grade, strength,
+tested_on). StdDevEstimator keeps O(1)-per-record running statistics per
+plant and grade (Welford, optionally over a rolling window), replays the
+log once and then only reads records appended since the last refresh.
+Its estimate feeds the target strength through the ``estimated_std_dev``
+design input; with fewer than ``min_samples`` results (30 in IS 10262) the
+assumed value from the grade table is used instead.
+"""
+
+import csv
+import math
+import os
+import threading
+from collections import deque
+from datetime import date
+
+MIN_SAMPLES = 30
+
+LOG_FIELDS = ('plant', 'grade', 'strength', 'tested_on')
+
+class RunningStats:
+    """Welford mean and sample standard deviation, optionally windowed."""
+
+    __slots__ = ('count', 'mean', '_m2', '_window')
+
+    def __init__(self, window=None):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self._window = deque(maxlen=window) if window else None
+
+    def add(self, value):
+        window = self._window
+        if window is not None and len(window) == window.maxlen:
+            self._remove(window[0])
+        if window is not None:
+            window.append(value)
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def _remove(self, value):
+        # Inverse Welford update for the value leaving the window
+        if self.count == 1:
+            self.count, self.mean, self._m2 = 0, 0.0, 0.0
+            return
+        self.count -= 1
+        delta = value - self.mean
+        self.mean -= delta / self.count
+        self._m2 = max(self._m2 - delta * (value - self.mean), 0.0)
+
+    @property
+    def std_dev(self):
+        if self.count < 2:
+            return None
+        return math.sqrt(self._m2 / (self.count - 1))
+
+class CubeResultLog:
+    """Append-only CSV log of cube test results."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def append(self, plant, grade, strength, tested_on=None):
+        self.append_many([(plant, grade, strength, tested_on)])
+
+    def append_many(self, records):
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', newline='') as handle:
+            writer = csv.writer(handle, lineterminator='\n')
+            if new_file:
+                writer.writerow(LOG_FIELDS)
+            for plant, grade, strength, tested_on in records:
+                if tested_on is None:
+                    tested_on = date.today()
+                if not isinstance(tested_on, str):
+                    tested_on = tested_on.isoformat()
+                writer.writerow((plant, grade, float(strength), tested_on))
+
+    def records(self, offset=0):
+        """Yield (record, next offset) for each complete line after byte ``offset``.
+
+        The record is None for a malformed line (wrong field count, or a
+        strength that is not a finite number), so callers can skip past it.
+        """
+        if not os.path.exists(self.path):
+            return
+        header = ','.join(LOG_FIELDS)
+        with open(self.path, 'rb') as handle:
+            handle.seek(offset)
+            for line in handle:
+                # A partially written last line is left for the next read
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                try:
+                    text = line.decode().rstrip('\r\n')
+                    if text == header or not text:
+                        continue
+                    fields = next(csv.reader([text])) if '"' in text else text.split(',')
+                    plant, grade, strength, tested_on = fields
+                    strength = float(strength)
+                except (ValueError, csv.Error):
+                    yield None, offset
+                    continue
+                if not math.isfinite(strength):
+                    yield None, offset
+                    continue
+                yield (plant, grade, strength, tested_on), offset
+
+class StdDevEstimator:
+    """Live standard deviation per plant and grade.
+
+    Thread-safe: the app shares one estimator between sessions, so readers
+    take the same lock as refresh() and add().
+    """
+
+    def __init__(self, log=None, window=None, min_samples=MIN_SAMPLES):
+        self.log = log
+        self.window = window
+        self.min_samples = min_samples
+        self._stats = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+        # Log lines skipped because they could not be read
+        self.malformed = 0
+
+    def add(self, plant, grade, strength):
+        with self._lock:
+            self._add(plant, grade, strength)
+
+    def _add(self, plant, grade, strength):
+        key = (plant, grade)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = RunningStats(self.window)
+        stats.add(strength)
+
+    def refresh(self):
+        """Fold in results appended to the log since the last refresh.
+
+        Returns the number of results added; malformed lines are skipped and
+        counted in ``malformed``.
+        """
+        if self.log is None:
+            return 0
+        count = 0
+        with self._lock:
+            for record, self._offset in self.log.records(self._offset):
+                if record is None:
+                    self.malformed += 1
+                    continue
+                plant, grade, strength, _ = record
+                self._add(plant, grade, strength)
+                count += 1
+        return count
+
+    def plants(self):
+        with self._lock:
+            return sorted({plant for plant, _ in self._stats})
+
+    def count(self, plant, grade):
+        with self._lock:
+            stats = self._stats.get((plant, grade))
+            return stats.count if stats else 0
+
+    def std_dev(self, plant, grade):
+        """Estimated S, or None when there are too few results."""
+        with self._lock:
+            stats = self._stats.get((plant, grade))
+            if stats is None or stats.count < self.min_samples:
+                return None
+            return stats.std_dev
+
+    def design_params(self, plant, grade):
+        """``mix_data`` entries that apply the estimate, if there is one."""
+        std_dev = self.std_dev(plant, grade)
+        return {} if std_dev is None else {'estimated_std_dev': std_dev}
@@ -0,0 +1,131 @@
+"""Array form of the design equations.
+
+Works on NumPy arrays of table codes (see ``mixdesign.core``) and mirrors
+ConcreteMixDesign stage by stage, so results match the scalar path exactly.
+"""
+
+import numpy as np
+
+from .core import (
+    ADMIX_WATER_REDUCTION, AGG_REDUCTION, AIR_CONTENT, BASE_COARSE_VOLUME, BASE_WATER,
+    SPECIFIC_GRAVITY_ADMIXTURE, SPECIFIC_GRAVITY_CEMENT, SPECIFIC_GRAVITY_COARSE_AGG,
+    SPECIFIC_GRAVITY_FINE_AGG, WC_BREAKPOINTS, WC_RATIOS
+)
+
+WC_BREAKPOINT_ARRAYS = tuple(np.array(breaks, dtype=float) for breaks in WC_BREAKPOINTS)
+WC_RATIO_ARRAYS = tuple(np.array(ratios) for ratios in WC_RATIOS)
+BASE_WATER_ARRAY = np.array(BASE_WATER, dtype=float)
+AIR_CONTENT_ARRAY = np.array(AIR_CONTENT)
+BASE_COARSE_VOLUME_ARRAY = np.array(BASE_COARSE_VOLUME)
+AGG_REDUCTION_ARRAY = np.array(AGG_REDUCTION, dtype=float)
+ADMIX_WATER_REDUCTION_ARRAY = np.array(ADMIX_WATER_REDUCTION)
+
+def grade_arrays(grade_properties, grades):
+    """f_ck, std_dev and X arrays indexed by position in ``grades``."""
+    return (
+        np.array([grade_properties[g]['f_ck'] for g in grades], dtype=float),
+        np.array([grade_properties[g]['std_dev'] for g in grades], dtype=float),
+        np.array([grade_properties[g]['X'] for g in grades], dtype=float)
+    )
+
+def target_strength(f_ck, std_dev, X, fair_control):
+    std_dev = std_dev + np.where(fair_control, 1.0, 0.0)
+    return np.maximum(f_ck + 1.65 * std_dev, f_ck + X), std_dev
+
+def wc_ratio(cement_code, target_strength, max_wc_ratio):
+    ratio = np.empty(len(target_strength))
+    for code, (breaks, ratios) in enumerate(zip(WC_BREAKPOINT_ARRAYS, WC_RATIO_ARRAYS)):
+        rows = cement_code == code
+        ratio[rows] = ratios[np.searchsorted(breaks, target_strength[rows], side='left')]
+    return np.minimum(ratio, max_wc_ratio)
+
+def water_content(size_code, agg_code, slump, water_reduction):
+    water_50mm_agg = BASE_WATER_ARRAY[size_code] - AGG_REDUCTION_ARRAY[agg_code]
+    slump_adjustment = ((slump - 50) / 25) * 0.03
+    water_for_slump = water_50mm_agg * (1 + slump_adjustment)
+    return np.round(water_for_slump * (1 - water_reduction))
+
+def cement_content(water, wc, min_cement_content):
+    # Returns the rounded cement content and the w/c ratio after the
+    # minimum-cement back-adjustment
+    cement = water / wc
+    below_min = cement < min_cement_content
+    cement = np.where(below_min, min_cement_content, cement)
+    return np.round(cement), np.where(below_min, water / cement, wc)
+
+def aggregate_proportions(size_code, zone_code, wc, pumped):
+    vol_coarse = BASE_COARSE_VOLUME_ARRAY[size_code, zone_code] + ((0.50 - wc) / 0.05) * 0.01
+    vol_coarse = np.where(pumped, vol_coarse * (1 - 0.10), vol_coarse)
+    return vol_coarse, 1 - vol_coarse
+
+def mix_masses(water, cement, vol_coarse, vol_fine, air, sg_cement, sg_coarse, sg_fine,
+               admixture_percentage, sg_admixture):
+    # Admixture mass, all-in aggregate volume and SSD fine/coarse masses
+    admixture_mass = cement * admixture_percentage / 100
+    vol_cement = cement / (sg_cement * 1000)
+    vol_water = water / 1000
+    vol_admixture = admixture_mass / (sg_admixture * 1000)
+    vol_all_aggregate = 1 - air - (vol_cement + vol_water + vol_admixture)
+    fine = vol_all_aggregate * vol_fine * sg_fine * 1000
+    coarse = vol_all_aggregate * vol_coarse * sg_coarse * 1000
+    return admixture_mass, vol_all_aggregate, np.round(fine), np.round(coarse)
+
+def design_arrays(f_ck, std_dev, X, fair_control, cement_code, max_wc_ratio, size_code,
+                  slump, agg_code, admix_code, min_cement_content, zone_code, pumped,
+                  water_reduction=None, sg_cement=SPECIFIC_GRAVITY_CEMENT,
+                  sg_coarse=SPECIFIC_GRAVITY_COARSE_AGG, sg_fine=SPECIFIC_GRAVITY_FINE_AGG,
+                  admixture_percentage=0.0, sg_admixture=SPECIFIC_GRAVITY_ADMIXTURE):
+    """Full design for arrays of parsed inputs; returns a dict of arrays.
+
+    Every code must be valid (size and zone codes within the coarse volume
+    table). ``water_reduction`` overrides the admixture table when given.
+    Specific gravities and the admixture dosage may be arrays or scalars.
+    """
+    if water_reduction is None:
+        water_reduction = ADMIX_WATER_REDUCTION_ARRAY[admix_code]
+    strength, std_dev = target_strength(f_ck, std_dev, X, fair_control)
+    wc = wc_ratio(cement_code, strength, max_wc_ratio)
+    water = water_content(size_code, agg_code, slump, water_reduction)
+    cement, wc_adjusted = cement_content(water, wc, min_cement_content)
+    vol_coarse, vol_fine = aggregate_proportions(size_code, zone_code, wc, pumped)
+    air = AIR_CONTENT_ARRAY[size_code] / 100
+    admixture_mass, vol_all_aggregate, fine, coarse = mix_masses(
+        water, cement, vol_coarse, vol_fine, air, sg_cement, sg_coarse, sg_fine,
+        admixture_percentage, sg_admixture)
+    return {
+        'target_strength': strength,
+        'std_dev': std_dev,
+        'wc_ratio': wc,
+        'wc_ratio_adjusted': wc_adjusted,
+        'water_content': water,
+        'cement_content': cement,
+        'vol_coarse': vol_coarse,
+        'vol_fine': vol_fine,
+        'air_content': air,
+        'admixture_mass': admixture_mass,
+        'vol_all_aggregate': vol_all_aggregate,
+        'fine_agg_mass': fine,
+        'coarse_agg_mass': coarse
+    }
+
+def design_mix_inputs(mixes):
+    """design_arrays() for a list of parsed MixInput objects.
+
+    Skips pandas entirely, so it pays off from a few dozen designs. Every
+    input must have valid size and zone codes.
+    """
+    def column(name, dtype=float):
+        return np.array([getattr(mix, name) for mix in mixes], dtype=dtype)
+
+    # design_std_dev() already applies site control and any estimated S
+    return design_arrays(
+        f_ck=column('f_ck'), std_dev=np.array([mix.design_std_dev() for mix in mixes]),
+        X=column('X'), fair_control=np.zeros(len(mixes), dtype=bool),
+        cement_code=column('cement_code', int), max_wc_ratio=column('max_wc_ratio'),
+        size_code=column('size_code', int), slump=column('workability_slump'),
+        agg_code=column('agg_code', int), admix_code=column('admix_code', int),
+        min_cement_content=column('min_cement_content'), zone_code=column('zone_code', int),
+        pumped=column('pumped', bool), sg_cement=column('sg_cement'),
+        sg_coarse=column('sg_coarse'), sg_fine=column('sg_fine'),
+        admixture_percentage=column('admixture_percentage'),
+        sg_admixture=column('sg_admixture'))
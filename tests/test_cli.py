@@ -0,0 +1,42 @@
+"""The batch runner writes every row, whatever the first chunk looks like."""
+
+import os
+import sys
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mixdesign.cli import run
+
+REQUEST = {
+    'grade': 'M30', 'exposure': 'Severe', 'cement_type': 'OPC 53', 'max_aggregate_size': 20,
+    'workability_slump': 100, 'fine_agg_zone': 'II'
+}
+
+def design(tmp_path, frame, chunk_size):
+    source = tmp_path / 'requests.csv'
+    target = tmp_path / 'designs.parquet'
+    frame.to_csv(source, index=False)
+    stats = run(str(source), str(target), chunk_size=chunk_size, workers=1, progress=False)
+    return stats, pq.read_table(target)
+
+def test_failed_first_chunk_keeps_numeric_results(tmp_path):
+    frame = pd.DataFrame([dict(REQUEST, grade='M99')] * 10 + [REQUEST] * 10)
+    stats, table = design(tmp_path, frame, chunk_size=10)
+    assert stats['failed'] == 10
+    for name in ('target_strength', 'cement_content', 'wc_ratio_adjusted', 'std_dev'):
+        assert str(table.schema.field(name).type) == 'double'
+    results = table.to_pandas()
+    assert results['cement_content'].iloc[10:].notna().all()
+    assert results['target_strength'].iloc[10] > 30
+
+def test_missing_exposure_fails_per_row(tmp_path):
+    frame = pd.DataFrame([REQUEST] * 5).drop(columns=['exposure'])
+    frame['max_wc_ratio'] = 0.45
+    frame['min_cement_content'] = 320
+    stats, table = design(tmp_path, frame, chunk_size=2)
+    assert stats['rows'] == 5 and stats['failed'] == 5
+    assert set(table.column('error').to_pylist()) == {"'exposure'"}
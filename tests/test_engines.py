@@ -0,0 +1,155 @@
+"""The scalar, batch, vectorized and incremental engines agree on every input.
+
+Random requests mix valid inputs with blank cells, unknown categories and
+values of the wrong type; every engine must give the scalar result, or the
+scalar error for rows it rejects. The scalar outputs must also still match
+the golden digest of the original engine.
+"""
+
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from bench_engine import GOLDEN_KEYS, GOLDEN_PATH, corpus, scalar_design, scalar_digest
+from mixdesign import (
+    ADMIXTURE_TYPES, AGGREGATE_SIZES, CEMENT_TYPES, EXPOSURE_OPTIONS, FINE_AGG_ZONES,
+    GRADES, SITE_CONTROLS, SLUMP_RANGE, ConcreteMixDesign, IncrementalDesign
+)
+from mixdesign.batch import design_batch
+from mixdesign.vectorized import design_mix_inputs
+
+# Valid values of each categorical input, and values the app never sends
+BLANKS = (None, np.nan)
+CHOICES = {
+    'grade': (GRADES, ['M99', None]),
+    'exposure': (list(EXPOSURE_OPTIONS), [None]),
+    'cement_type': (CEMENT_TYPES, [53, *BLANKS]),
+    'max_aggregate_size': (list(AGGREGATE_SIZES), [12, np.nan]),
+    'fine_agg_zone': (list(FINE_AGG_ZONES), ['V', None]),
+    'aggregate_type': (['Crushed angular aggregate', 'Rounded gravel', 'Sub-angular aggregate'],
+                       [None]),
+    'use_admixture': ([True, False], []),
+    'admixture_type': (ADMIXTURE_TYPES, [7, *BLANKS]),
+    'site_control': (SITE_CONTROLS, [None]),
+    'placing_method': (['Chute (Non pumpable)', 'Pumpable'], [None])
+}
+
+def random_requests(rows, seed, invalid=0.1):
+    """``rows`` requests; each input is invalid or blank with probability ``invalid``."""
+    rng = np.random.default_rng(seed)
+    records = []
+    for _ in range(rows):
+        params = {}
+        for key, (valid, others) in CHOICES.items():
+            pool = others if others and rng.random() < invalid else valid
+            params[key] = pool[rng.integers(len(pool))]
+        exposure = EXPOSURE_OPTIONS.get(params['exposure'], EXPOSURE_OPTIONS['Moderate'])
+        params['max_wc_ratio'] = exposure['max_wc']
+        params['min_cement_content'] = float(exposure['min_cement'])
+        params['workability_slump'] = float(rng.uniform(*SLUMP_RANGE))
+        params['specific_gravity_cement'] = float(rng.uniform(3.10, 3.20))
+        params['specific_gravity_fine_agg'] = float(rng.uniform(2.55, 2.75))
+        params['admixture_percentage'] = float(rng.uniform(0.5, 2.0))
+        params['estimated_std_dev'] = float(rng.uniform(2.0, 6.0)) if rng.random() < 0.3 else np.nan
+        for key in ('max_wc_ratio', 'min_cement_content', 'workability_slump',
+                    'specific_gravity_cement', 'admixture_percentage'):
+            if rng.random() < invalid / 2:
+                params[key] = np.nan
+        # Numbers read as text, some of them unreadable
+        for key in ('workability_slump', 'specific_gravity_fine_agg', 'estimated_std_dev'):
+            draw = rng.random()
+            if draw < invalid / 4:
+                params[key] = 'abc'
+            elif draw < invalid / 2 and params[key] == params[key]:
+                params[key] = str(params[key])
+        records.append(params)
+    # Through a frame, so the scalar path sees the values design_batch() does
+    return pd.DataFrame(records)
+
+def outputs(results):
+    if not results['success']:
+        return False, results['error']
+    return True, tuple(float(results[key]) for key in GOLDEN_KEYS)
+
+@pytest.fixture(scope='module')
+def requests():
+    return random_requests(3000, seed=1)
+
+@pytest.fixture(scope='module')
+def scalar(requests):
+    return [outputs(scalar_design(params)) for params in requests.to_dict('records')]
+
+def test_requests_cover_failures(scalar):
+    failed = sum(not success for success, _ in scalar)
+    assert 0 < failed < len(scalar)
+    errors = {error for success, error in scalar if not success}
+    # The sizes column holds blanks, so 12 arrives as a float
+    assert {"'workability_slump'", "'min_cement_content'", "'cement_type'",
+            "'V'", '12.0', "could not convert string to float: 'abc'"} <= errors
+
+def test_batch_matches_scalar(requests, scalar):
+    batch = design_batch(requests)
+    for index, expected in enumerate(scalar):
+        row = batch.iloc[index]
+        if row['success']:
+            actual = True, tuple(float(row[key]) for key in GOLDEN_KEYS)
+        else:
+            actual = False, row['error']
+        assert actual == expected, (index, requests.iloc[index].to_dict())
+
+@pytest.mark.parametrize('missing', ['exposure', 'min_cement_content'])
+def test_batch_fails_missing_columns_per_row(requests, missing):
+    frame = requests.drop(columns=[missing]).iloc[:200]
+    batch = design_batch(frame)
+    assert not batch['success'].any()
+    for index, params in enumerate(frame.to_dict('records')):
+        assert outputs(scalar_design(params)) == (False, batch.iloc[index]['error']), params
+
+def test_batch_chunks_match_whole_frame(requests):
+    whole = design_batch(requests)
+    chunks = pd.concat([design_batch(requests.iloc[start:start + 97])
+                        for start in range(0, len(requests), 97)])
+    pd.testing.assert_frame_equal(whole, chunks)
+
+def test_vectorized_matches_scalar(requests, scalar):
+    designers = []
+    expected = []
+    for params, result in zip(requests.to_dict('records'), scalar):
+        if result[0]:
+            designer = ConcreteMixDesign()
+            designer.set_input_parameters(params)
+            designers.append(designer.parsed_input())
+            expected.append(result[1])
+    design = design_mix_inputs(designers)
+    actual = list(zip(*(design[key].tolist() for key in GOLDEN_KEYS)))
+    assert actual == expected
+
+def test_incremental_matches_scalar(requests, scalar):
+    for params, expected in zip(requests.to_dict('records'), scalar):
+        assert outputs(IncrementalDesign(params).result()) == expected, params
+
+def test_incremental_updates_match_scalar(requests):
+    # One session walked through the requests, one changed input at a time
+    records = requests.to_dict('records')
+    incremental = IncrementalDesign(records[0])
+    current = dict(records[0])
+    rng = np.random.default_rng(2)
+    for params in records[1:300]:
+        key = list(params)[rng.integers(len(params))]
+        current[key] = params[key]
+        incremental.update({key: params[key]})
+        assert outputs(incremental.result()) == outputs(scalar_design(current)), (key, current)
+
+def test_scalar_matches_golden_digest():
+    with open(GOLDEN_PATH) as handle:
+        golden = json.load(handle)
+    records = corpus(golden['rows'], golden['seed']).to_dict('records')
+    assert scalar_digest(records) == golden['digest']
@@ -0,0 +1,41 @@
+"""Report runs name every report uniquely and never stop on a name."""
+
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mixdesign.reports import ReportWriter, run
+
+REQUEST = {
+    'grade': 'M30', 'exposure': 'Severe', 'cement_type': 'OPC 53', 'max_aggregate_size': 20,
+    'workability_slump': 100, 'fine_agg_zone': 'II'
+}
+
+def test_colliding_names_get_suffixes(tmp_path):
+    writer = ReportWriter(str(tmp_path / 'reports'))
+    names = [writer.write('a.html', b'1'), writer.write('a-row000002.html', b'2'),
+             writer.write('a.html', b'3', row=2), writer.write('a.html', b'4')]
+    writer.close()
+    assert names == ['a.html', 'a-row000002.html', 'a-row000002-2.html', 'a-2.html']
+    assert sorted(os.listdir(tmp_path / 'reports')) == sorted(names)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_numeric_ids_and_repeats(tmp_path, workers):
+    frame = pd.DataFrame([REQUEST] * 6)
+    frame['report_id'] = [17, np.nan, 17, 18, 18, 18]
+    source = tmp_path / 'requests.csv'
+    frame.to_csv(source, index=False)
+    target = tmp_path / 'reports.zip'
+    stats = run(str(source), str(target), formats=('txt',), chunk_size=2, workers=workers,
+                progress=False)
+    assert stats['reports'] == 6
+    with zipfile.ZipFile(target) as archive:
+        assert archive.namelist() == ['17.txt', 'mix-000001.txt', '17-row000002.txt',
+                                      '18.txt', '18-row000004.txt', '18-row000005.txt']
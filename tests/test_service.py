@@ -0,0 +1,41 @@
+"""One malformed request in a micro-batch only fails that request."""
+
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from mixdesign import service
+from mixdesign.service import DesignService
+
+REQUEST = {
+    'grade': 'M30', 'exposure': 'Severe', 'cement_type': 'OPC 53', 'max_aggregate_size': 20,
+    'fine_agg_zone': 'II', 'max_wc_ratio': 0.45, 'min_cement_content': 320
+}
+
+def design_all(requests):
+    async def run():
+        designs = DesignService()
+        designs.start()
+        return await asyncio.gather(*(designs.design(params) for params in requests))
+    return [json.loads(body) for body in asyncio.run(run())]
+
+@pytest.mark.parametrize('estimate', [[4.2], 'abc'])
+def test_bad_request_fails_alone(estimate):
+    requests = [dict(REQUEST, workability_slump=50 + i) for i in range(40)]
+    requests.append(dict(REQUEST, workability_slump=75, estimated_std_dev=estimate))
+    results = design_all(requests)
+    assert all(result['success'] for result in results[:-1])
+    assert not results[-1]['success']
+
+def test_vector_failure_falls_back_to_scalar(monkeypatch):
+    def fail(mixes):
+        raise RuntimeError('vectorized design failed')
+    monkeypatch.setattr(service, 'design_mix_inputs', fail)
+    results = design_all([dict(REQUEST, workability_slump=50 + i) for i in range(40)])
+    assert all(result['success'] for result in results)